@@ -0,0 +1,262 @@
+"""Time the converter functions on a synthetic corpus and check for regressions.
+
+Runs pdf_to_images_converter, the pdf-to-word pipeline (see
+pdf_to_word_case), word_to_pdf_converter and merge_pdfs on deterministic
+documents (see corpus.py). Each run
+happens in a freshly forked process, which records wall time, CPU time
+(including poppler child processes) and peak RSS. The median of
+--repeat runs is reported for each case. Results can be saved as a
+baseline and later runs compared against it; any metric that grows by
+more than --threshold (and by more than a small absolute noise floor)
+counts as a regression and makes the script exit with status 1.
+pdf-to-images cases run once per --render-modes entry, so the direct and
+PIL render paths can be compared; they are skipped when poppler is not
+installed. Page throughput is reported alongside the resource metrics.
+
+Usage (from backend/):
+    python benchmarks/converters.py --sizes 1,10,100 --save-baseline bench_baseline.json
+    python benchmarks/converters.py --sizes 1,10,100 --baseline bench_baseline.json
+    python benchmarks/converters.py --converters merge-pdf --sizes 1000 --kinds text
+    python benchmarks/converters.py --converters merge-pdf --sizes 5 --merge-inputs 200
+    python benchmarks/converters.py --converters pdf-to-images --render-modes direct,pil
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus import KINDS, corpus_file  # noqa: E402
+
+CONVERTERS = ("pdf-to-images", "pdf-to-word", "word-to-pdf", "merge-pdf")
+MERGE_INPUTS = 4  # merge-pdf cases merge this many variants of the corpus PDF by default
+METRICS = ("wall_s", "cpu_s", "peak_rss_mb", "child_peak_rss_mb")
+# Differences below these are treated as noise, whatever the relative change
+NOISE_FLOOR = {"wall_s": 0.02, "cpu_s": 0.02, "peak_rss_mb": 4.0, "child_peak_rss_mb": 4.0}
+
+
+def run_case(conn, func, args):
+    """Child process body: run one conversion and send back its resource usage"""
+    self_before = resource.getrusage(resource.RUSAGE_SELF)
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+    try:
+        ok = bool(func(*args))
+    except Exception as e:
+        print(f"Benchmark case raised: {e}")
+        ok = False
+    wall = time.perf_counter() - start
+    self_after = resource.getrusage(resource.RUSAGE_SELF)
+    children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu = (
+        (self_after.ru_utime - self_before.ru_utime) + (self_after.ru_stime - self_before.ru_stime)
+        + (children_after.ru_utime - children_before.ru_utime)
+        + (children_after.ru_stime - children_before.ru_stime)
+    )
+    conn.send({
+        "ok": ok,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": self_after.ru_maxrss / 1024,
+        "child_peak_rss_mb": children_after.ru_maxrss / 1024,
+    })
+    conn.close()
+
+
+def measure(func, args) -> dict:
+    """Run func(*args) in a forked process and return its measurements"""
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=run_case, args=(sender, func, args))
+    process.start()
+    sender.close()
+    try:
+        result = receiver.recv()
+    except EOFError:
+        result = {"ok": False}
+    process.join()
+    return result
+
+
+def build_corpus(corpus_dir: str, documents):
+    """Generate the corpus documents in a child process, so the memory used
+    to build them does not count towards the measured peak RSS"""
+    context = multiprocessing.get_context("fork")
+    process = context.Process(
+        target=lambda: [corpus_file(corpus_dir, *document) for document in documents]
+    )
+    process.start()
+    process.join()
+    if process.exitcode != 0:
+        sys.exit("Building the benchmark corpus failed")
+
+
+def pdf_to_word_case(backend, source: str, output_path: str) -> bool:
+    """The work /convert/pdf-to-word does for an upload: probe the PDF,
+    extract its text in chunks with get_pdf_text and build the DOCX.
+    No document hash is passed, so the text cache is never consulted. The
+    lifespan has not run, so run_conversion sends the chunks to the default
+    thread executor rather than the conversion pool."""
+    probe = backend.probe_pdf(source)
+    page_texts = asyncio.run(backend.get_pdf_text(source, probe["page_count"]))
+    return backend.build_word_document(page_texts, output_path)
+
+
+def build_cases(backend, corpus_dir: str, workdir: str, converters, sizes, kinds, render_modes, merge_inputs):
+    """Return (name, pages, function, args) for every selected benchmark case"""
+    cases = []
+    documents = set()
+    poppler = backend.poppler_available()
+    for converter in converters:
+        if converter == "pdf-to-images" and not poppler:
+            print("Skipping pdf-to-images: poppler not found")
+            continue
+        for kind in kinds:
+            for pages in sizes:
+                name = f"{converter}/{kind}/{pages}p"
+                extension = ".docx" if converter == "word-to-pdf" else ".pdf"
+                documents.add((extension, pages, kind))
+                source = os.path.join(corpus_dir, f"{kind}_{pages}p{extension}")
+                if converter == "pdf-to-images":
+                    for mode in render_modes:
+                        cases.append((f"{converter}[{mode}]/{kind}/{pages}p", pages, backend.pdf_to_images_converter,
+                                      (source, os.path.join(workdir, "out.zip"), {"render_mode": mode})))
+                elif converter == "pdf-to-word":
+                    cases.append((name, pages, pdf_to_word_case, (backend, source, os.path.join(workdir, "out.docx"))))
+                elif converter == "word-to-pdf":
+                    cases.append((name, pages, backend.word_to_pdf_converter, (source, os.path.join(workdir, "out.pdf"))))
+                else:
+                    # Distinct documents from the same generator, like a batch of reports
+                    sources = [source]
+                    for variant in range(1, merge_inputs):
+                        documents.add((extension, pages, kind, variant))
+                        sources.append(os.path.join(corpus_dir, f"{kind}_{pages}p_v{variant}{extension}"))
+                    if merge_inputs != MERGE_INPUTS:
+                        name = f"{name}x{merge_inputs}"
+                    cases.append((name, pages * merge_inputs, backend.merge_pdfs,
+                                  (sources, os.path.join(workdir, "out.pdf"))))
+    build_corpus(corpus_dir, sorted(documents))
+    return cases
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return a list of (case, metric, baseline, current) regressions"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        for metric in METRICS:
+            if metric not in previous or metric not in current:
+                continue
+            before, after = previous[metric], current[metric]
+            if after > before * (1 + threshold) and after - before > NOISE_FLOOR[metric]:
+                regressions.append((name, metric, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--converters", default=",".join(CONVERTERS))
+    parser.add_argument("--sizes", default="1,10,100,1000", help="page counts")
+    parser.add_argument("--kinds", default=",".join(KINDS))
+    parser.add_argument("--render-modes", default="direct,pil", help="pdf-to-images render modes to compare")
+    parser.add_argument("--merge-inputs", type=int, default=MERGE_INPUTS, help="documents per merge-pdf case")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus-dir", help="reuse generated documents from this directory")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative growth per metric")
+    parser.add_argument("--save-baseline", help="write the results to this file")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    converters = [name for name in args.converters.split(",") if name]
+    unknown = set(converters) - set(CONVERTERS)
+    if unknown:
+        parser.error(f"unknown converters: {', '.join(sorted(unknown))}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    kinds = [kind for kind in args.kinds.split(",") if kind]
+    render_modes = [mode for mode in args.render_modes.split(",") if mode]
+
+    # Resolve output paths before changing directory
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    save_path = os.path.abspath(args.save_baseline) if args.save_baseline else None
+    output_path = os.path.abspath(args.output) if args.output else None
+    corpus_dir = os.path.abspath(args.corpus_dir) if args.corpus_dir else tempfile.mkdtemp(prefix="bench_corpus_")
+    os.makedirs(corpus_dir, exist_ok=True)
+
+    workdir = tempfile.mkdtemp(prefix="converter_bench_")
+    os.chdir(workdir)  # main.py creates its uploads directory relative to the cwd
+    sys.path.insert(0, BACKEND_DIR)
+    import main as backend
+
+    unknown = set(render_modes) - set(backend.RENDER_MODES)
+    if unknown:
+        parser.error(f"unknown render modes: {', '.join(sorted(unknown))}")
+
+    results = {}
+    print(f"{'case':<40} {'ok':>3} {'wall s':>9} {'cpu s':>9} {'pages/s':>8} {'rss MB':>8} {'child MB':>9}")
+    cases = build_cases(backend, corpus_dir, workdir, converters, sizes, kinds, render_modes, args.merge_inputs)
+    for name, pages, func, func_args in cases:
+        runs = [measure(func, func_args) for _ in range(args.repeat)]
+        ok = all(run.get("ok") for run in runs)
+        summary = {"ok": ok}
+        if ok:
+            for metric in METRICS:
+                summary[metric] = statistics.median(run[metric] for run in runs)
+            summary["pages_per_s"] = pages / summary["wall_s"] if summary["wall_s"] > 0 else 0.0
+            print(f"{name:<40} {'yes':>3} {summary['wall_s']:>9.3f} {summary['cpu_s']:>9.3f} "
+                  f"{summary['pages_per_s']:>8.1f} {summary['peak_rss_mb']:>8.1f} {summary['child_peak_rss_mb']:>9.1f}")
+        else:
+            print(f"{name:<40} {'no':>3}")
+        results[name] = summary
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    report = {
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "repeat": args.repeat,
+        "results": results,
+    }
+    for path in (save_path, output_path):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            print(f"Results written to {path}")
+
+    failed = [name for name, summary in results.items() if not summary["ok"]]
+    if failed:
+        print(f"Failed cases: {', '.join(failed)}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        if baseline.get("machine", {}).get("platform") != report["machine"]["platform"]:
+            print("Warning: baseline was recorded on a different platform")
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+        for name, metric, before, after in regressions:
+            growth = f"+{(after / before - 1) * 100:.0f}%" if before else "was 0"
+            print(f"REGRESSION {name} {metric}: {before:.3f} -> {after:.3f} ({growth})")
+        if not regressions:
+            print(f"No regressions beyond {args.threshold:.0%} against {baseline_path}")
+        if regressions or failed:
+            sys.exit(1)
+    elif failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
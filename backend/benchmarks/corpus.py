@@ -0,0 +1,127 @@
+"""Deterministic synthetic PDF and DOCX documents for the benchmarks.
+
+Documents are generated from fixed seeds, so a given (kind, pages, variant)
+always produces the same content; variants differ in their text. Kinds:
+    text   - text-only pages
+    mixed  - text with a table every few pages and a small image on every other page
+    image  - one large photo-like image per page plus a caption
+Built files are reused if they already exist in the corpus directory.
+"""
+import io
+import os
+import random
+
+from PIL import Image
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+KINDS = ("text", "mixed", "image")
+DISTINCT_IMAGES = 16  # image pages cycle through this many distinct pictures
+WORDS = (
+    "conversion document page render archive stream window shard encode "
+    "quality latency budget buffer memory worker process thread output input"
+).split()
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def photo(seed: int, size=(1200, 900)) -> Image.Image:
+    """A smooth, photo-like RGB image: upscaled low-resolution noise"""
+    rng = random.Random(seed)
+    small = Image.frombytes("RGB", (48, 36), rng.randbytes(48 * 36 * 3))
+    return small.resize(size, Image.BICUBIC)
+
+
+def jpeg_bytes(image: Image.Image) -> bytes:
+    """Encode as JPEG, the way scanned and photographed pages usually arrive"""
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def build_pdf(path: str, pages: int, kind: str = "text", variant: int = 0):
+    """Write a synthetic PDF with the given number of pages"""
+    rng = random.Random(f"{pages}/{variant}" if variant else pages)
+    images = {}
+    c = canvas.Canvas(path, pagesize=letter, invariant=1)
+    width, height = letter
+    for page in range(pages):
+        c.setFont("Helvetica-Bold", 20)
+        c.drawString(72, height - 72, f"Benchmark page {page + 1}")
+        if kind == "image":
+            seed = page % DISTINCT_IMAGES
+            if seed not in images:
+                images[seed] = ImageReader(io.BytesIO(jpeg_bytes(photo(seed))))
+            c.drawImage(images[seed], 72, 200, width=width - 144, height=(width - 144) * 0.75)
+            c.setFont("Helvetica", 11)
+            c.drawString(72, 170, sentence(rng, 12))
+        else:
+            lines = 44 if kind == "text" else 24
+            c.setFont("Helvetica", 10)
+            for line in range(lines):
+                c.drawString(72, height - 100 - line * 14, sentence(rng, 14))
+            if kind == "mixed":
+                if page % 2 == 0:
+                    seed = page % DISTINCT_IMAGES
+                    if seed not in images:
+                        images[seed] = ImageReader(io.BytesIO(jpeg_bytes(photo(seed, (600, 450)))))
+                    c.drawImage(images[seed], 72, 72, width=240, height=180)
+                if page % 5 == 0:
+                    for row in range(6):
+                        for col in range(3):
+                            c.rect(340 + col * 80, 72 + row * 24, 80, 24)
+                            c.drawString(344 + col * 80, 80 + row * 24, f"r{row}c{col}")
+        c.showPage()
+    c.save()
+
+
+def build_docx(path: str, pages: int, kind: str = "text", variant: int = 0):
+    """Write a synthetic DOCX of roughly the given number of pages"""
+    from docx import Document
+    from docx.shared import Inches
+
+    rng = random.Random(f"{pages}/{variant}" if variant else pages)
+    pictures = {}
+    doc = Document()
+    for page in range(pages):
+        doc.add_heading(f"Section {page + 1}", level=1 if page % 10 == 0 else 2)
+        if kind == "image":
+            seed = page % DISTINCT_IMAGES
+            if seed not in pictures:
+                pictures[seed] = jpeg_bytes(photo(seed))
+            doc.add_picture(io.BytesIO(pictures[seed]), width=Inches(6))
+            doc.add_paragraph(sentence(rng, 12))
+            continue
+        paragraphs = 8 if kind == "text" else 5
+        for _ in range(paragraphs):
+            doc.add_paragraph(" ".join(sentence(rng, 12) for _ in range(5)))
+        if kind == "mixed":
+            if page % 5 == 0:
+                table = doc.add_table(rows=6, cols=3)
+                for row_index, row in enumerate(table.rows):
+                    for col_index, cell in enumerate(row.cells):
+                        cell.text = f"r{row_index}c{col_index}"
+            if page % 2 == 0:
+                seed = page % DISTINCT_IMAGES
+                if seed not in pictures:
+                    pictures[seed] = jpeg_bytes(photo(seed, (600, 450)))
+                doc.add_picture(io.BytesIO(pictures[seed]), width=Inches(3))
+        doc.add_page_break()
+    doc.save(path)
+
+
+def corpus_file(corpus_dir: str, extension: str, pages: int, kind: str, variant: int = 0) -> str:
+    """Path of a corpus document, building it on first use"""
+    suffix = f"_v{variant}" if variant else ""
+    path = os.path.join(corpus_dir, f"{kind}_{pages}p{suffix}{extension}")
+    if not os.path.exists(path):
+        partial = path + ".partial"
+        if extension == ".pdf":
+            build_pdf(partial, pages, kind, variant)
+        else:
+            build_docx(partial, pages, kind, variant)
+        os.replace(partial, path)
+    return path
@@ -0,0 +1,311 @@
+"""Drive the API with concurrent mixed traffic and report latency and errors.
+
+By default the FastAPI app is imported and driven in-process through
+httpx's ASGI transport, with its lifespan (conversion pool, janitor)
+started as uvicorn would. The harness then shares the event loop with
+the app, so it also samples event-loop stalls directly. With --url it
+targets a running server instead, e.g. a local uvicorn.
+
+--mix sets the relative weight of each endpoint. `download` fetches the
+output of an earlier successful conversion. Each request claims to come
+from one of --clients addresses through X-Forwarded-For, which the
+in-process app is set to trust, so the per-client rate limits apply as
+they would behind a proxy. The in-process result cache is disabled
+unless --cache is given, since the same inputs are uploaded over and
+over; run a remote server with CACHE_MAX_BYTES=0 for the same effect.
+
+The report (stdout summary plus --output JSON) has p50/p95/p99 latency,
+throughput, status counts and 429/503 rates per endpoint and overall,
+and event-loop lag from the app's /metrics and, in-process, from a local
+sampler.
+
+Usage (from backend/):
+    python benchmarks/load.py --duration 30 --concurrency 16 --output load.json
+    python benchmarks/load.py --mix pdf-to-word=1,pdf-to-images=1 --pages 200 --kind image
+    python benchmarks/load.py --url http://127.0.0.1:8000 --requests 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus import KINDS, corpus_file  # noqa: E402
+
+ENDPOINTS = ("pdf-to-word", "word-to-pdf", "merge-pdf", "pdf-to-images", "download")
+DEFAULT_MIX = "pdf-to-word=4,word-to-pdf=3,merge-pdf=2,pdf-to-images=1,download=4"
+LAG_SAMPLE_INTERVAL = 0.01  # seconds between local event-loop lag samples
+
+
+def parse_mix(mix: str) -> dict:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"unknown endpoint in mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """Latency and status statistics for a list of (latency, status) samples"""
+    statuses = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    latencies = [latency for latency, _ in samples]
+    count = len(samples)
+    summary = {
+        "requests": count,
+        "throughput_rps": count / elapsed if elapsed > 0 else 0.0,
+        "status_counts": statuses,
+        "rate_429": statuses.get("429", 0) / count if count else 0.0,
+        "rate_503": statuses.get("503", 0) / count if count else 0.0,
+        "error_rate": sum(
+            n for status, n in statuses.items() if status == "error" or int(status) >= 500
+        ) / count if count else 0.0,
+    }
+    if latencies:
+        summary.update({
+            "p50_s": percentile(latencies, 0.50),
+            "p95_s": percentile(latencies, 0.95),
+            "p99_s": percentile(latencies, 0.99),
+            "mean_s": sum(latencies) / count,
+            "max_s": max(latencies),
+        })
+    return summary
+
+
+def parse_lag_metrics(text: str) -> dict:
+    """Pull the event_loop_lag_seconds histogram out of a /metrics scrape"""
+    lag = {"count": 0.0, "sum": 0.0, "buckets": {}}
+    for line in text.splitlines():
+        if not line.startswith("event_loop_lag_seconds"):
+            continue
+        name, _, value = line.rpartition(" ")
+        if name.startswith("event_loop_lag_seconds_bucket"):
+            bound = name.split('le="', 1)[1].split('"', 1)[0]
+            lag["buckets"][bound] = float(value)
+        elif name.startswith("event_loop_lag_seconds_sum"):
+            lag["sum"] = float(value)
+        elif name.startswith("event_loop_lag_seconds_count"):
+            lag["count"] = float(value)
+    return lag
+
+
+async def scrape_lag(client: httpx.AsyncClient) -> dict:
+    try:
+        response = await client.get("/metrics")
+        return parse_lag_metrics(response.text)
+    except httpx.HTTPError:
+        return {"count": 0.0, "sum": 0.0, "buckets": {}}
+
+
+def lag_delta(before: dict, after: dict, stall_s: float) -> dict:
+    """Event-loop lag observed by the server between two scrapes"""
+    count = after["count"] - before["count"]
+    below = None
+    for bound, value in after["buckets"].items():
+        if bound != "+Inf" and float(bound) <= stall_s:
+            candidate = value - before["buckets"].get(bound, 0.0)
+            if below is None or float(bound) > below[0]:
+                below = (float(bound), candidate)
+    return {
+        "samples": int(count),
+        "mean_s": (after["sum"] - before["sum"]) / count if count else 0.0,
+        # Samples above the largest histogram bucket not exceeding --stall-ms
+        "stalls": int(count - below[1]) if below else None,
+    }
+
+
+class LoadRun:
+    """Shared state of the virtual users"""
+
+    def __init__(self, client, weights, documents, clients, rng, stall_s):
+        self.client = client
+        self.names = list(weights)
+        self.weights = [weights[name] for name in self.names]
+        self.documents = documents
+        self.clients = clients
+        self.rng = rng
+        self.stall_s = stall_s
+        self.samples = {name: [] for name in ENDPOINTS}
+        self.downloads = []
+        self.lag_samples = []
+
+    def headers(self) -> dict:
+        address = self.rng.randrange(self.clients)
+        return {"X-Forwarded-For": f"10.{address >> 16 & 255}.{address >> 8 & 255}.{address & 255}"}
+
+    async def request(self, endpoint: str):
+        docs = self.documents
+        if endpoint == "download" and not self.downloads:
+            endpoint = "pdf-to-word"  # nothing to download yet
+        start = time.perf_counter()
+        try:
+            if endpoint == "download":
+                url = self.rng.choice(self.downloads)
+                async with self.client.stream("GET", url, headers=self.headers()) as response:
+                    async for _ in response.aiter_bytes():
+                        pass
+            elif endpoint == "merge-pdf":
+                files = [("files", ("a.pdf", docs["pdf"], "application/pdf")),
+                         ("files", ("b.pdf", docs["small_pdf"], "application/pdf"))]
+                response = await self.client.post("/convert/merge-pdf", files=files, headers=self.headers())
+            elif endpoint == "word-to-pdf":
+                files = {"file": ("input.docx", docs["docx"], "application/octet-stream")}
+                response = await self.client.post("/convert/word-to-pdf", files=files, headers=self.headers())
+            else:
+                files = {"file": ("input.pdf", docs["pdf"], "application/pdf")}
+                response = await self.client.post(f"/convert/{endpoint}", files=files, headers=self.headers())
+            status = response.status_code
+        except httpx.HTTPError as e:
+            print(f"{endpoint} request failed: {e}")
+            status = "error"
+        latency = time.perf_counter() - start
+        self.samples[endpoint].append((latency, status))
+        if endpoint != "download" and status == 200:
+            self.downloads.append(response.json()["download_url"])
+            del self.downloads[:-100]
+
+    async def user(self, deadline: float, remaining: list):
+        while time.perf_counter() < deadline:
+            if remaining[0] is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            endpoint = self.rng.choices(self.names, self.weights)[0]
+            await self.request(endpoint)
+
+    async def sample_lag(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(LAG_SAMPLE_INTERVAL)
+            self.lag_samples.append(max(0.0, loop.time() - start - LAG_SAMPLE_INTERVAL))
+
+
+async def drive(client, args, weights, documents, local_lag: bool) -> dict:
+    rng = random.Random(args.seed)
+    run = LoadRun(client, weights, documents, args.clients, rng, args.stall_ms / 1000)
+    lag_before = await scrape_lag(client)
+    sampler = asyncio.create_task(run.sample_lag()) if local_lag else None
+    deadline = time.perf_counter() + (args.duration if args.requests is None else float("inf"))
+    remaining = [args.requests]
+    start = time.perf_counter()
+    await asyncio.gather(*(run.user(deadline, remaining) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+    if sampler is not None:
+        sampler.cancel()
+    lag_after = await scrape_lag(client)
+
+    all_samples = [sample for samples in run.samples.values() for sample in samples]
+    event_loop = {"server": lag_delta(lag_before, lag_after, run.stall_s)}
+    if run.lag_samples:
+        event_loop["local"] = {
+            "samples": len(run.lag_samples),
+            "p50_s": percentile(run.lag_samples, 0.50),
+            "p99_s": percentile(run.lag_samples, 0.99),
+            "max_s": max(run.lag_samples),
+            "stalls": sum(1 for lag in run.lag_samples if lag > run.stall_s),
+        }
+    return {
+        "config": {
+            "target": args.url or "in-process",
+            "mix": weights,
+            "concurrency": args.concurrency,
+            "clients": args.clients,
+            "pages": args.pages,
+            "kind": args.kind,
+            "stall_ms": args.stall_ms,
+        },
+        "elapsed_s": elapsed,
+        "overall": summarize(all_samples, elapsed),
+        "endpoints": {name: summarize(samples, elapsed) for name, samples in run.samples.items() if samples},
+        "event_loop": event_loop,
+    }
+
+
+async def run_in_process(args, weights, documents) -> dict:
+    os.chdir(tempfile.mkdtemp(prefix="load_bench_"))  # uploads, cache and rate limit store go here
+    sys.path.insert(0, BACKEND_DIR)
+    import main as backend
+
+    backend.TRUST_PROXY_HEADERS = True
+    if not args.cache:
+        backend.CACHE_MAX_BYTES = 0
+    transport = httpx.ASGITransport(app=backend.app)
+    async with backend.app.router.lifespan_context(backend.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+            return await drive(client, args, weights, documents, local_lag=True)
+
+
+async def run_remote(args, weights, documents) -> dict:
+    async with httpx.AsyncClient(base_url=args.url, timeout=None) as client:
+        return await drive(client, args, weights, documents, local_lag=False)
+
+
+def print_report(report: dict):
+    print(f"{'endpoint':<15} {'reqs':>6} {'rps':>7} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'429':>6} {'503':>6}")
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for name, s in rows:
+        print(f"{name:<15} {s['requests']:>6} {s['throughput_rps']:>7.2f} {s.get('p50_s', 0):>8.3f} "
+              f"{s.get('p95_s', 0):>8.3f} {s.get('p99_s', 0):>8.3f} {s['rate_429']:>6.1%} {s['rate_503']:>6.1%}")
+    for source, lag in report["event_loop"].items():
+        print(f"event loop ({source}): {json.dumps(lag)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="target a running server instead of the in-process app")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight pairs")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, help="stop after this many requests instead")
+    parser.add_argument("--clients", type=int, default=50, help="distinct client addresses")
+    parser.add_argument("--pages", type=int, default=10, help="pages in the uploaded documents")
+    parser.add_argument("--kind", default="mixed", choices=KINDS)
+    parser.add_argument("--corpus-dir", help="reuse generated documents from this directory")
+    parser.add_argument("--cache", action="store_true", help="keep the in-process result cache enabled")
+    parser.add_argument("--stall-ms", type=float, default=100.0, help="event-loop lag that counts as a stall")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    output_path = os.path.abspath(args.output) if args.output else None
+    corpus_dir = os.path.abspath(args.corpus_dir) if args.corpus_dir else tempfile.mkdtemp(prefix="bench_corpus_")
+    os.makedirs(corpus_dir, exist_ok=True)
+
+    documents = {}
+    for name, extension, pages in (("pdf", ".pdf", args.pages), ("small_pdf", ".pdf", 1), ("docx", ".docx", args.pages)):
+        with open(corpus_file(corpus_dir, extension, pages, args.kind), "rb") as f:
+            documents[name] = f.read()
+
+    runner = run_remote if args.url else run_in_process
+    report = asyncio.run(runner(args, weights, documents))
+    print_report(report)
+    if output_path:
+        with open(output_path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Report written to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
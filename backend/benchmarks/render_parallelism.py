@@ -0,0 +1,59 @@
+"""Compare pdf-to-images render time across parallelism levels.
+
+Runs pdf_to_images_converter once per parallelism level on a corpus PDF
+(see corpus.py), so the numbers line up with converters.py. Level 1 is the
+same windowed renderer with a single worker, not a one-shot
+convert_from_path call; speedups are relative to the first level listed.
+Requires poppler.
+
+Usage (from backend/):
+    python benchmarks/render_parallelism.py --pages 200 --levels 1,4,8,16
+    python benchmarks/render_parallelism.py --pages 100 --kind image --corpus-dir bench_corpus
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus import KINDS, corpus_file  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--levels", default="1,2,4,8")
+    parser.add_argument("--kind", default="text", choices=KINDS)
+    parser.add_argument("--corpus-dir", help="reuse generated documents from this directory")
+    args = parser.parse_args()
+
+    corpus_dir = os.path.abspath(args.corpus_dir) if args.corpus_dir else tempfile.mkdtemp(prefix="bench_corpus_")
+    os.makedirs(corpus_dir, exist_ok=True)
+    workdir = tempfile.mkdtemp(prefix="render_bench_")
+    os.chdir(workdir)  # main.py creates its uploads directory relative to the cwd
+    sys.path.insert(0, BACKEND_DIR)
+    import main as backend
+
+    pdf_path = corpus_file(corpus_dir, ".pdf", args.pages, args.kind)
+
+    levels = [int(level) for level in args.levels.split(",")]
+    backend.MAX_RENDER_PARALLELISM = max(levels + [backend.MAX_RENDER_PARALLELISM])
+
+    baseline = None
+    print(f"{'parallelism':>12} {'seconds':>10} {'pages/s':>10} {'speedup':>8}")
+    for level in levels:
+        zip_path = os.path.join(workdir, f"out_{level}.zip")
+        start = time.perf_counter()
+        pages = backend.pdf_to_images_converter(pdf_path, zip_path, {"parallelism": level})
+        elapsed = time.perf_counter() - start
+        if pages != args.pages:
+            print(f"parallelism {level}: rendered {pages} of {args.pages} pages")
+        if baseline is None:
+            baseline = elapsed
+        print(f"{level:>12} {elapsed:>10.2f} {pages / elapsed:>10.1f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
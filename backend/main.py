@@ -1,15 +1,33 @@
 import os
+import hashlib
+import importlib
+import importlib.util
+import json
+import mimetypes
 import shutil
+import sqlite3
 import tempfile
 import asyncio
+import heapq
+import itertools
+import multiprocessing
+import threading
+import contextvars
+import signal
+import sys
+from collections import deque
 from datetime import datetime, timedelta
-from typing import List, Optional
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterator, List, Optional
+from xml.sax.saxutils import escape
 import uuid
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import asynccontextmanager
  
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, status
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, File, Form, Request, UploadFile, HTTPException, Depends, status
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
@@ -21,63 +39,269 @@ except ImportError:
     AIOFILES_AVAILABLE = False
     print("Warning: aiofiles not available. Install with: pip install aiofiles")
 
-try:
-    import PyPDF2
-    PYPDF2_AVAILABLE = True
-except ImportError:
-    PYPDF2_AVAILABLE = False
-    print("Warning: PyPDF2 not available. Install with: pip install PyPDF2")
+# Converter dependencies are only located at import time. Each is imported
+# where it is first used (or up front by warm_up_converters), so API workers
+# and pool processes only pay for the converters they actually run.
+DEPENDENCIES = {
+    "PyPDF2": {"modules": ("PyPDF2", "PyPDF2.generic"), "install": "pip install PyPDF2"},
+    "reportlab": {
+        "modules": ("reportlab.lib.colors", "reportlab.lib.pagesizes", "reportlab.lib.styles", "reportlab.platypus"),
+        "install": "pip install reportlab",
+    },
+    "python-docx": {
+        "modules": ("docx", "docx.oxml.ns", "docx.table", "docx.text.paragraph"),
+        "install": "pip install python-docx",
+    },
+    "pdf2image": {"modules": ("pdf2image", "PIL.Image"), "install": "pip install pdf2image Pillow"},
+}
 
-try:
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import letter
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
-    print("Warning: reportlab not available. Install with: pip install reportlab")
+def dependency_installed(name: str) -> bool:
+    """Whether an optional dependency can be imported, checked without importing it"""
+    packages = {module.split(".")[0] for module in DEPENDENCIES[name]["modules"]}
+    return all(importlib.util.find_spec(package) is not None for package in packages)
 
-try:
-    from docx import Document
-    DOCX_AVAILABLE = True
-except ImportError:
-    DOCX_AVAILABLE = False
-    print("Warning: python-docx not available. Install with: pip install python-docx")
+DEPENDENCY_INSTALLED = {name: dependency_installed(name) for name in DEPENDENCIES}
+for name, installed in DEPENDENCY_INSTALLED.items():
+    if not installed:
+        print(f"Warning: {name} not available. Install with: {DEPENDENCIES[name]['install']}")
 
-try:
-    from pdf2image import convert_from_path, convert_from_bytes
-    from PIL import Image
-    PDF2IMAGE_AVAILABLE = True
-except ImportError:
-    PDF2IMAGE_AVAILABLE = False
-    print("Warning: pdf2image not available. Install with: pip install pdf2image Pillow")
+PYPDF2_AVAILABLE = DEPENDENCY_INSTALLED["PyPDF2"]
+REPORTLAB_AVAILABLE = DEPENDENCY_INSTALLED["reportlab"]
+DOCX_AVAILABLE = DEPENDENCY_INSTALLED["python-docx"]
+PDF2IMAGE_AVAILABLE = DEPENDENCY_INSTALLED["pdf2image"]
 
 import io
 
 # Rate limiting and security
-from collections import defaultdict
+import math
 import time
 
 # Configuration
 UPLOAD_DIR = "uploads"
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB read/write chunks while ingesting uploads
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", 8))  # uploads of one request saved at once
 ALLOWED_PDF_TYPES = ["application/pdf"]
 ALLOWED_WORD_TYPES = [
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
     "application/msword"
 ]
+IMAGES_FAILED_DETAIL = "PDF conversion failed. Could not extract images from PDF. The PDF file might be corrupted, password-protected, or in an unsupported format."
+
+# Scratch janitor: every file this process writes to UPLOAD_DIR (uploads,
+# outputs before they are published, render scratch) is tracked in an
+# in-memory expiry index and removed in the background once it expires or the
+# quota is exceeded
+ARTIFACT_TTL = int(os.getenv("ARTIFACT_TTL", 3600))  # 1 hour
+UPLOAD_QUOTA_BYTES = int(os.getenv("UPLOAD_QUOTA_BYTES", 5 * 1024 * 1024 * 1024))  # 5GB
+JANITOR_INTERVAL = int(os.getenv("JANITOR_INTERVAL", 60))  # seconds between sweeps
+JANITOR_BATCH = int(os.getenv("JANITOR_BATCH", 200))  # max artifacts removed per batch
+artifact_heap = []  # (expires_at, path), may hold stale entries
+artifact_index: Dict[str, tuple] = {}  # live artifacts: path -> (expires_at, size)
+artifacts_in_use = set()  # uploads and outputs a request or job still reads; never swept
+artifact_bytes = 0
+
+# Artifact store: finished outputs are published from UPLOAD_DIR to a storage
+# backend and indexed in SQLite with their owner, size, SHA-256, content type
+# and expiry. Every worker and host that shares the index and the backend can
+# serve any download, sweep expired artifacts and reuse cached results.
+# ARTIFACT_BACKEND is "local" (files in ARTIFACT_DIR, which may be a shared
+# mount) or "module:factory", a callable returning an object with the methods
+# of LocalArtifactBackend (e.g. an object store client).
+ARTIFACT_BACKEND = os.getenv("ARTIFACT_BACKEND", "local")
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "artifacts")
+ARTIFACT_INDEX_PATH = os.getenv("ARTIFACT_INDEX_PATH", "artifacts.sqlite3")
+ARTIFACT_QUOTA_BYTES = int(os.getenv("ARTIFACT_QUOTA_BYTES", 5 * 1024 * 1024 * 1024))  # 5GB
+artifact_backend = None  # opened on first use, see get_artifact_backend
+artifact_local = threading.local()
 
-# Rate limiting storage
-request_counts = defaultdict(list)
+# Downloads: strong ETags are the SHA-256 recorded when the artifact was
+# published. Caching is allowed until the artifact expires.
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # bytes per read when streaming from the store
+DOWNLOAD_MEDIA_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".zip": "application/zip",
+}
+
+# Rate limiting: approximate sliding window per (endpoint, client), stored in
+# SQLite so every uvicorn worker on the host shares the same counters
 RATE_LIMIT = 10  # requests per minute
 RATE_WINDOW = 60  # seconds
+RATE_LIMITS = {  # requests per RATE_WINDOW, lower for the more expensive endpoints
+    "pdf-to-word": int(os.getenv("RATE_LIMIT_PDF_TO_WORD", RATE_LIMIT)),
+    "word-to-pdf": int(os.getenv("RATE_LIMIT_WORD_TO_PDF", RATE_LIMIT)),
+    "merge-pdf": int(os.getenv("RATE_LIMIT_MERGE_PDF", 6)),
+    "pdf-to-images": int(os.getenv("RATE_LIMIT_PDF_TO_IMAGES", 4)),
+    "batch": int(os.getenv("RATE_LIMIT_BATCH", 2)),
+}
+RATE_LIMIT_DB = os.getenv("RATE_LIMIT_DB", "ratelimit.sqlite3")
+RATE_LIMIT_EVICT_INTERVAL = 60  # seconds between idle-key sweeps in each process
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true"
+# Proxies in front of the API that append to X-Forwarded-For. The client is
+# the entry this many places from the right; everything left of it is
+# whatever the client chose to send.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", 1))
+rate_limit_local = threading.local()
+rate_limit_last_evict = 0.0
+
+# Conversion executor: CPU-heavy converters run in a process pool sized to the
+# cores, and each converter type has its own concurrency limit on top of that
+CONVERSION_WORKERS = int(os.getenv("CONVERSION_WORKERS", os.cpu_count() or 1))
+CONVERTER_LIMITS = {
+    "pdf-to-word": int(os.getenv("PDF_TO_WORD_LIMIT", CONVERSION_WORKERS)),
+    "word-to-pdf": int(os.getenv("WORD_TO_PDF_LIMIT", CONVERSION_WORKERS)),
+    "merge-pdf": int(os.getenv("MERGE_PDF_LIMIT", max(1, CONVERSION_WORKERS // 2))),
+    "pdf-to-images": int(os.getenv("PDF_TO_IMAGES_LIMIT", max(1, CONVERSION_WORKERS // 2))),
+}
+converter_semaphores = {
+    name: asyncio.Semaphore(limit) for name, limit in CONVERTER_LIMITS.items()
+}
+conversion_pool: Optional[ProcessPoolExecutor] = None
+progress_queue = None  # multiprocessing.Queue carrying job progress out of the pool
+# Converters report progress per page; a pool worker sends at most one
+# message per job and stage every PROGRESS_INTERVAL seconds, plus the last one
+PROGRESS_INTERVAL = float(os.getenv("PROGRESS_INTERVAL", 0.25))
+progress_sent: Dict[tuple, float] = {}  # (job_id, stage) -> monotonic time of the last message, per worker
+progress_unsent: Dict[tuple, int] = {}  # (job_id, stage) -> pages counted but not yet sent, per worker
+
+# pdf-to-word extracts text in chunks of this many pages on separate workers
+PDF_TEXT_CHUNK_PAGES = int(os.getenv("PDF_TEXT_CHUNK_PAGES", 50))
+
+# word-to-pdf lays out the docx body this many flowables at a time
+WORD_LAYOUT_CHUNK = int(os.getenv("WORD_LAYOUT_CHUNK", 200))
+word_pdf_styles: Optional[dict] = None  # reportlab styles for word-to-pdf, built once per process
+
+# merge-pdf takes up to MAX_MERGE_FILES inputs, MAX_MERGE_TOTAL_SIZE bytes in total
+MAX_MERGE_FILES = int(os.getenv("MAX_MERGE_FILES", 500))
+MAX_MERGE_TOTAL_SIZE = int(os.getenv("MAX_MERGE_TOTAL_SIZE", 1024 * 1024 * 1024))  # 1GB
+
+# pdf-to-images renders this many pages at a time before writing them out,
+# fewer if their decoded size would exceed RENDER_WINDOW_MAX_BYTES
+RENDER_DPI = 150
+# pdf-to-images request options: DPI bounds, a per-page pixel cap that lowers
+# the DPI of oversized pages, and output formats (format -> file extension)
+MIN_RENDER_DPI = 36
+MAX_RENDER_DPI = int(os.getenv("MAX_RENDER_DPI", 600))
+MAX_RENDER_PIXELS = int(os.getenv("MAX_RENDER_PIXELS", 50_000_000))
+IMAGE_FORMATS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+IMAGE_PROFILES = ("fast", "balanced", "small")  # encoder speed vs output size
+DEFAULT_IMAGE_QUALITY = {"jpeg": 85, "webp": 80}
+# "direct": poppler writes the page files and Python only moves them into the
+# archive; "pil": pages are decoded into PIL images and re-encoded, for when
+# pixels need post-processing
+RENDER_MODES = ("direct", "pil")
+RENDER_MODE = os.getenv("RENDER_MODE", "direct")
+RENDER_WINDOW_PAGES = int(os.getenv("RENDER_WINDOW_PAGES", 8))
+RENDER_WINDOW_MAX_BYTES = int(os.getenv("RENDER_WINDOW_MAX_BYTES", 512 * 1024 * 1024))
+# Each window is split into shards rendered in parallel by separate poppler
+# processes. The default spreads the cores over the concurrent pdf-to-images
+# conversions; requests may ask for up to MAX_RENDER_PARALLELISM.
+MAX_RENDER_PARALLELISM = os.cpu_count() or 1
+RENDER_PARALLELISM = int(os.getenv(
+    "RENDER_PARALLELISM", max(1, MAX_RENDER_PARALLELISM // CONVERTER_LIMITS["pdf-to-images"])
+))
+
+# Conversion result cache: outputs are kept in the artifact store under a key
+# derived from the input hashes, converter and parameters, and evicted LRU
+# over the budget. CACHE_DIR holds the index; share it along with the
+# artifact store so every worker and host reuses the same results.
+CACHE_DIR = os.getenv("CACHE_DIR", "cache")
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", 1024 * 1024 * 1024))  # 1GB, 0 disables
+CACHE_INDEX_PATH = os.path.join(CACHE_DIR, "index.sqlite3")
+cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+cache_local = threading.local()
+
+# Metrics, exposed in Prometheus text format on /metrics
+METRIC_BUCKETS = {
+    "default": (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+    "conversion_pages_per_second": (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+}
+METRIC_HELP = {
+    "http_requests_total": ("counter", "HTTP requests by endpoint and status"),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by endpoint"),
+    "conversion_stage_seconds": ("histogram", "Time spent in each conversion stage"),
+    "conversion_pages_total": ("counter", "Pages processed by conversions"),
+    "conversion_pages_per_second": ("histogram", "Page throughput of each conversion"),
+    "upload_bytes_total": ("counter", "Bytes received in uploads"),
+    "output_bytes_total": ("counter", "Bytes of conversion output produced"),
+    "event_loop_lag_seconds": ("histogram", "Delay of the event loop in waking a sleeping task"),
+    "admission_rejected_total": ("counter", "Conversion requests turned away because the admission queue was full"),
+    "admission_wait_seconds": ("histogram", "Time conversions waited for memory and CPU budget"),
+    "conversions_cancelled_total": ("counter", "Conversions stopped by client disconnect or time limit"),
+    "conversion_workers_killed_total": ("counter", "Pool workers killed for overrunning a cancelled conversion"),
+}
+EVENT_LOOP_LAG_INTERVAL = 0.5  # seconds between event-loop lag samples
+metric_counters: Dict[tuple, float] = {}
+metric_histograms: Dict[tuple, list] = {}
+metrics_lock = threading.Lock()
+conversions_active = {name: 0 for name in CONVERTER_LIMITS}
+conversions_queued = {name: 0 for name in CONVERTER_LIMITS}
+in_conversion_worker = False  # True inside pool processes, which ship metrics to the parent
+
+# Admission control: each conversion's peak memory and CPU use is estimated
+# before it starts and it waits until both fit in the global budget. Requests
+# are turned away with 503 before their upload is read once
+# ADMISSION_QUEUE_LIMIT conversion requests are already waiting. Only
+# requests that hold a connection open count: background jobs wait for the
+# same budget but are bounded separately by MAX_PENDING_JOBS, so a burst of
+# submitted jobs queues up instead of closing the door to /convert.
+def default_memory_budget() -> int:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2
+    except (ValueError, OSError, AttributeError):
+        return 2 * 1024 * 1024 * 1024
+
+ADMISSION_MEMORY_BUDGET = int(os.getenv("ADMISSION_MEMORY_BUDGET", default_memory_budget()))
+ADMISSION_CPU_BUDGET = float(os.getenv("ADMISSION_CPU_BUDGET", os.cpu_count() or 1))
+ADMISSION_QUEUE_LIMIT = int(os.getenv("ADMISSION_QUEUE_LIMIT", 16))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 10))  # seconds
+CONVERSION_BASE_MEMORY = 64 * 1024 * 1024  # interpreter, libraries and buffers of one conversion
+TEXT_MEMORY_FACTOR = 8  # peak memory of the text/document paths per byte of input
+admission_usage = {"memory": 0, "cpu": 0.0}
+admission_waiters = deque()  # (memory, cpu, future) in arrival order
+admission_pending = 0  # conversion requests past the door but not yet admitted
+admission_ticket = contextvars.ContextVar("admission_ticket", default=None)
+
+# Cancellation: a conversion stops when its client disconnects or when it runs
+# past its converter's wall-clock budget. Converters check between pages and
+# stages and poppler is given the remaining budget as its timeout; a worker
+# that has not stopped CONVERSION_KILL_GRACE seconds later is killed and the
+# pool restarted. Time spent waiting for admission does not count.
+CONVERSION_TIME_LIMITS = {  # seconds
+    "pdf-to-word": int(os.getenv("PDF_TO_WORD_TIME_LIMIT", 300)),
+    "word-to-pdf": int(os.getenv("WORD_TO_PDF_TIME_LIMIT", 300)),
+    "merge-pdf": int(os.getenv("MERGE_PDF_TIME_LIMIT", 300)),
+    "pdf-to-images": int(os.getenv("PDF_TO_IMAGES_TIME_LIMIT", 600)),
+}
+CONVERSION_KILL_GRACE = float(os.getenv("CONVERSION_KILL_GRACE", 5))
+CANCEL_POLL_INTERVAL = 0.5  # seconds between disconnect/deadline checks
+CLIENT_CLOSED_REQUEST = 499  # status of conversions whose client went away
+conversion_scope = contextvars.ContextVar("conversion_scope", default=None)
+conversion_guard = threading.local()  # cancel marker and deadline of the call running in this thread
+conversion_workers: Dict[str, Optional[int]] = {}  # cancel marker -> pid of the pool worker running that call
+
+# Batch conversion: one request converts up to MAX_BATCH_FILES files with the
+# same single-input converter and returns one archive
+MAX_BATCH_FILES = int(os.getenv("MAX_BATCH_FILES", 20))
+BATCH_CONVERTERS = ("pdf-to-word", "word-to-pdf", "pdf-to-images")
+
+# Asynchronous jobs
+JOBS: Dict[str, dict] = {}
+job_tasks = set()  # strong references so running job tasks are not garbage collected
+MAX_PENDING_JOBS = int(os.getenv("MAX_PENDING_JOBS", 100))  # queued + running; not part of ADMISSION_QUEUE_LIMIT
+JOB_RETENTION = 3600  # seconds a finished job stays queryable
+# /jobs/{id}/events streams job updates as server-sent events; idle streams
+# get a comment line every JOB_EVENTS_KEEPALIVE seconds so proxies keep them open
+JOB_EVENTS_KEEPALIVE = float(os.getenv("JOB_EVENTS_KEEPALIVE", 15))
+job_watchers: Dict[str, asyncio.Event] = {}  # job_id -> event set on its next update
 
 # Security
 security = HTTPBearer(auto_error=False)
 
-# Ensure upload directory exists
+# Ensure upload and cache directories exist
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
 
 # Function to find poppler path
 def find_poppler_path():
@@ -99,192 +323,1137 @@ def find_poppler_path():
     print("Poppler not found in common locations")
     return None
 
-# Find poppler path at startup
-POPPLER_PATH = find_poppler_path()
+POPPLER_PATH: Optional[str] = None
+poppler_probed = False
+
+def get_poppler_path() -> Optional[str]:
+    """The poppler bin directory, probed on first use (None: use poppler from PATH)"""
+    global POPPLER_PATH, poppler_probed
+    if not poppler_probed:
+        POPPLER_PATH = find_poppler_path()
+        poppler_probed = True
+    return POPPLER_PATH
+
+def poppler_available() -> bool:
+    return get_poppler_path() is not None or shutil.which("pdftoppm") is not None
 
-# Utility function to validate PDF file
-def validate_pdf_file(file_path: str) -> bool:
-    """Validate if the PDF file is readable"""
+# Converter registry: the dependencies each converter needs, and the ones it
+# uses when present (pdf-to-images probes with PyPDF2, falling back to pdfinfo)
+CONVERTER_DEPENDENCIES = {
+    "pdf-to-word": {"requires": ("PyPDF2", "python-docx"), "uses": ()},
+    "word-to-pdf": {"requires": ("python-docx", "reportlab"), "uses": ()},
+    "merge-pdf": {"requires": ("PyPDF2",), "uses": ()},
+    "pdf-to-images": {"requires": ("pdf2image",), "uses": ("PyPDF2",)},
+}
+# Converters whose dependencies every pool worker imports as it starts, instead
+# of on first use: comma-separated names or "all"
+CONVERTER_WARMUP = [
+    name.strip() for name in os.getenv("CONVERTER_WARMUP", "").split(",")
+    if name.strip() in CONVERTER_DEPENDENCIES or name.strip() == "all"
+]
+if "all" in CONVERTER_WARMUP:
+    CONVERTER_WARMUP = list(CONVERTER_DEPENDENCIES)
+
+def load_dependency(name: str) -> bool:
+    """Import an optional dependency now; False if it is missing or broken"""
+    if not DEPENDENCY_INSTALLED[name]:
+        return False
+    started = time.perf_counter()
+    try:
+        for module in DEPENDENCIES[name]["modules"]:
+            importlib.import_module(module)
+    except Exception as e:
+        print(f"Loading {name} failed: {e}")
+        return False
+    print(f"Loaded {name} in {time.perf_counter() - started:.2f}s")
+    return True
+
+def dependency_loaded(name: str) -> bool:
+    return all(module in sys.modules for module in DEPENDENCIES[name]["modules"])
+
+def warm_up_converters(converters: List[str]):
+    """Import the dependencies of the given converters ahead of their first use"""
+    for converter in converters:
+        spec = CONVERTER_DEPENDENCIES[converter]
+        for name in spec["requires"] + spec["uses"]:
+            if not dependency_loaded(name):
+                load_dependency(name)
+
+def converter_status(converter: str) -> dict:
+    """Availability of a converter for /health, checked without importing anything"""
+    missing = [name for name in CONVERTER_DEPENDENCIES[converter]["requires"] if not DEPENDENCY_INSTALLED[name]]
+    if converter == "pdf-to-images" and not poppler_available():
+        missing.append("poppler")
+    return {"available": not missing, "missing": missing, "warm_up": converter in CONVERTER_WARMUP}
+
+# PDF probe: each upload is parsed once and the resulting record is shared by
+# validation, the render strategy, memory estimates and the response
+def probe_pdf(file_path: str) -> dict:
+    """Parse a PDF once and record page count, page sizes, encryption and linearization.
+    
+    `valid` is False when the file cannot be parsed or has no pages.
+    `needs_password` is True for encrypted files that do not open with an
+    empty password. Page sizes are (width, height) in points.
+    """
+    started = time.perf_counter()
+    probe = {
+        "valid": False,
+        "file_size": os.path.getsize(file_path),
+        "page_count": 0,
+        "page_sizes": [],
+        "max_page_size": (0.0, 0.0),
+        "encrypted": False,
+        "needs_password": False,
+        "linearized": False,
+    }
     try:
-        if not PYPDF2_AVAILABLE:
-            return True  # Skip validation if PyPDF2 not available
-            
         with open(file_path, 'rb') as pdf_file:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            # Try to get page count
-            page_count = len(pdf_reader.pages)
-            print(f"PDF validation: {page_count} pages found")
-            return page_count > 0
+            # The linearization dictionary must be the first object in the file
+            probe["linearized"] = b"/Linearized" in pdf_file.read(1024)
+            pdf_file.seek(0)
+            
+            if not PYPDF2_AVAILABLE:
+                # Fall back to poppler's pdfinfo when PyPDF2 is not available
+                from pdf2image import pdfinfo_from_path
+                info = pdfinfo_from_path(file_path, poppler_path=get_poppler_path())
+                probe["page_count"] = int(info.get("Pages", 0))
+                probe["encrypted"] = info.get("Encrypted", "no").startswith("yes")
+                size = info.get("Page size", "").split()
+                if len(size) >= 3:
+                    page_size = (float(size[0]), float(size[2]))
+                    probe["page_sizes"] = [page_size] * probe["page_count"]
+            else:
+                import PyPDF2
+                pdf_reader = PyPDF2.PdfReader(pdf_file)
+                if pdf_reader.is_encrypted:
+                    probe["encrypted"] = True
+                    # Owner-password-only files still open with an empty password
+                    if not pdf_reader.decrypt(""):
+                        probe["needs_password"] = True
+                        return probe
+                probe["page_sizes"] = [
+                    (float(page.mediabox.width), float(page.mediabox.height))
+                    for page in pdf_reader.pages
+                ]
+                probe["page_count"] = len(probe["page_sizes"])
+        
+        if probe["page_sizes"]:
+            probe["max_page_size"] = (
+                max(width for width, _ in probe["page_sizes"]),
+                max(height for _, height in probe["page_sizes"])
+            )
+        probe["valid"] = probe["page_count"] > 0
+        print(f"PDF validation: {probe['page_count']} pages found")
     except Exception as e:
         print(f"PDF validation failed: {e}")
-        return False
+    record_stage("validate", time.perf_counter() - started)
+    return probe
+
+def validate_pdf_probe(probe: dict, invalid_detail: str = "Conversion failed"):
+    """Raise an HTTP error for uploads that cannot be converted"""
+    if probe["needs_password"]:
+        raise HTTPException(status_code=400, detail="PDF is password-protected")
+    if not probe["valid"]:
+        raise HTTPException(status_code=500, detail=invalid_detail)
+
+def estimate_page_bytes(probe: dict, dpi: int = RENDER_DPI) -> int:
+    """Estimate the decoded RGB size of the largest page at the given DPI"""
+    width, height = probe["max_page_size"]
+    if not width or not height:
+        width, height = 612.0, 792.0  # assume US Letter when sizes are unknown
+    return int((width / 72 * dpi) * (height / 72 * dpi) * 3)
+
+def render_with_method(method: str, pdf_path: str, first_page: int, last_page: int, output_folder: Optional[str] = None, settings: Optional[dict] = None) -> list:
+    """Render a page range with one of the poppler invocation methods.
+    
+    Returns PIL images, or, when `output_folder` is given, the paths of the
+    files poppler wrote there (no decoding in Python). `settings` may set
+    `dpi`, `grayscale`, for file output `fmt` and `jpegopt`, and a wall-clock
+    `deadline` after which poppler is killed.
+    """
+    from pdf2image import convert_from_bytes, convert_from_path
+    
+    settings = settings or {}
+    
+    def options(first: int, last: int) -> dict:
+        kwargs = {
+            "dpi": settings.get("dpi", RENDER_DPI),
+            "grayscale": settings.get("grayscale", False),
+            "first_page": first,
+            "last_page": last,
+            "thread_count": 1,  # Parallelism comes from rendering shards concurrently
+            "strict": False,  # Less strict parsing
+            "timeout": remaining_budget(settings.get("deadline")),
+        }
+        if output_folder is not None:
+            kwargs.update({
+                "output_folder": output_folder,
+                # A distinct prefix per range keeps concurrent shards apart
+                "output_file": f"p{first:06d}-",
+                "fmt": settings.get("fmt", "png"),
+                "jpegopt": settings.get("jpegopt"),
+                "paths_only": True,
+            })
+        return kwargs
+    
+    if method == "poppler_path":
+        # Method 1: explicit poppler path and conservative settings
+        return convert_from_path(
+            pdf_path,
+            poppler_path=get_poppler_path(),
+            size=None,
+            transparent=False,
+            single_file=False,
+            **options(first_page, last_page)
+        )
+    if method == "system":
+        # Method 2: poppler from PATH
+        return convert_from_path(pdf_path, **options(first_page, last_page))
+    if method == "bytes":
+        # Method 3: pipe the file to poppler from memory
+        with open(pdf_path, 'rb') as pdf_file:
+            pdf_bytes = pdf_file.read()
+        return convert_from_bytes(pdf_bytes, poppler_path=get_poppler_path(), **options(first_page, last_page))
+    # Method 4: page by page, stopping at the first page that fails
+    images = []
+    for page_num in range(first_page, last_page + 1):
+        try:
+            images.extend(convert_from_path(
+                pdf_path, poppler_path=get_poppler_path(), **options(page_num, page_num)
+            ))
+        except Exception as e:
+            print(f"Failed to convert page {page_num}: {e}")
+            break
+    return images
+
+def release_page(page):
+    """Free a rendered page: close a PIL image or delete a rendered file"""
+    if isinstance(page, str):
+        try:
+            os.remove(page)
+        except OSError:
+            pass
+    else:
+        page.close()
+
+def discard_rendered_files(output_folder: str, first_page: int, last_page: int):
+    """Delete the files render_with_method wrote for a page range"""
+    prefixes = tuple(f"p{page:06d}-" for page in range(first_page, last_page + 1))
+    for name in os.listdir(output_folder):
+        if name.startswith(prefixes):
+            release_page(os.path.join(output_folder, name))
+
+RENDER_METHODS = ["poppler_path", "system", "bytes", "per_page"]
+
+def render_page_window(pdf_path: str, first_page: int, last_page: int, strategy: Optional[dict] = None, output_folder: Optional[str] = None, settings: Optional[dict] = None) -> list:
+    """Render pages first_page..last_page to PIL images, or to files in
+    `output_folder`, trying several methods.
+    
+    `strategy` remembers the method that last worked so later windows of the
+    same document try it first instead of re-running methods that failed.
+    """
+    strategy = strategy if strategy is not None else {}
+    methods = [m for m in RENDER_METHODS if m != "poppler_path" or get_poppler_path()]
+    if strategy.get("method") in methods:
+        methods.remove(strategy["method"])
+        methods.insert(0, strategy["method"])
+    
+    for method in methods:
+        if render_cancelled(settings):
+            # Poppler was killed or is out of time: don't start another method
+            break
+        try:
+            images = render_with_method(method, pdf_path, first_page, last_page, output_folder, settings)
+        except Exception as e:
+            print(f"Method {method} failed for pages {first_page}-{last_page}: {e}")
+            if output_folder is not None:
+                # Don't let a failed run's files mix with the next method's output
+                discard_rendered_files(output_folder, first_page, last_page)
+            continue
+        if images:
+            strategy["method"] = method
+            return images
+    return []
+
+def split_page_range(first_page: int, last_page: int, shards: int) -> List[tuple]:
+    """Split first_page..last_page into at most `shards` contiguous ranges"""
+    page_count = last_page - first_page + 1
+    shards = max(1, min(shards, page_count))
+    size, extra = divmod(page_count, shards)
+    ranges = []
+    start = first_page
+    for i in range(shards):
+        end = start + size - 1 + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+def render_window_parallel(executor: ThreadPoolExecutor, pdf_path: str, first_page: int, last_page: int, parallelism: int, strategy: dict, output_folder: Optional[str] = None, settings: Optional[dict] = None) -> list:
+    """Render a page window as parallel shards and return the pages (images
+    or file paths) in page order.
+    
+    Rendering stops at the first shard that comes back short, so the result
+    is always a contiguous run of pages starting at first_page.
+    """
+    shards = split_page_range(first_page, last_page, parallelism)
+    futures = [
+        executor.submit(render_page_window, pdf_path, start, end, strategy, output_folder, settings)
+        for start, end in shards
+    ]
+    
+    images = []
+    complete = True
+    for (start, end), future in zip(shards, futures):
+        try:
+            shard_images = future.result() or []
+        except Exception as e:
+            print(f"Rendering pages {start}-{end} failed: {e}")
+            shard_images = []
+        if complete:
+            images.extend(shard_images)
+            complete = len(shard_images) == end - start + 1
+        else:
+            for page in shard_images:
+                release_page(page)
+    return images
+
+def resolve_render_parallelism(requested: Optional[int]) -> int:
+    """Clamp a requested render parallelism to 1..MAX_RENDER_PARALLELISM"""
+    if requested is None:
+        requested = RENDER_PARALLELISM
+    return max(1, min(int(requested), MAX_RENDER_PARALLELISM))
+
+def parse_page_ranges(spec: str) -> List[tuple]:
+    """Parse a page selection such as "1-3,7,10-" into sorted, merged
+    (first, last) ranges; an open range like "10-" has last=None.
+    Raises ValueError for malformed selections.
+    """
+    ranges = []
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        first = int(first) if first else 1
+        last = (int(last) if last else None) if dash else first
+        if first < 1 or (last is not None and last < first):
+            raise ValueError(f"invalid page range: {part}")
+        ranges.append((first, last))
+    if not ranges:
+        raise ValueError("no pages selected")
+    
+    ranges.sort(key=lambda r: r[0])
+    merged = [ranges[0]]
+    for first, last in ranges[1:]:
+        prev_first, prev_last = merged[-1]
+        if prev_last is None or first <= prev_last + 1:
+            if prev_last is not None:
+                merged[-1] = (prev_first, None if last is None else max(prev_last, last))
+        else:
+            merged.append((first, last))
+    return merged
+
+def format_page_ranges(ranges: List[tuple]) -> str:
+    """Canonical text form of parse_page_ranges() output"""
+    return ",".join(
+        f"{first}-" if last is None else str(first) if first == last else f"{first}-{last}"
+        for first, last in ranges
+    )
+
+def resolve_page_ranges(spec: Optional[str], page_count: int) -> List[tuple]:
+    """The (first, last) page ranges of a document selected by `spec`
+    (every page if None); ranges past the end are clipped or dropped"""
+    if not spec:
+        return [(1, page_count)]
+    return [
+        (first, page_count if last is None else min(last, page_count))
+        for first, last in parse_page_ranges(spec)
+        if first <= page_count
+    ]
+
+def resolve_render_dpi(probe: dict, options: dict) -> int:
+    """The requested DPI, lowered so the largest page fits within max_width x
+    max_height pixels and MAX_RENDER_PIXELS"""
+    width, height = probe["max_page_size"]
+    if not width or not height:
+        width, height = 612.0, 792.0  # assume US Letter when sizes are unknown
+    candidates = [options.get("dpi") or RENDER_DPI]
+    if options.get("max_width"):
+        candidates.append(options["max_width"] * 72 / width)
+    if options.get("max_height"):
+        candidates.append(options["max_height"] * 72 / height)
+    candidates.append(math.sqrt(MAX_RENDER_PIXELS / (width * height)) * 72)
+    return max(1, int(min(candidates)))
+
+def resolve_render_mode(options: dict) -> str:
+    """Pick the render path; WebP and the "small" PNG profile need PIL encoding"""
+    image_format = options.get("format", "png")
+    if image_format == "webp" or (image_format == "png" and options.get("profile") == "small"):
+        return "pil"
+    return options.get("render_mode") or RENDER_MODE
+
+def poppler_output_settings(options: dict) -> dict:
+    """pdf2image fmt/jpegopt for writing pages directly in the requested format"""
+    if options.get("format") != "jpeg":
+        return {"fmt": "png"}
+    profile = options.get("profile", "balanced")
+    return {
+        "fmt": "jpeg",
+        "jpegopt": {
+            "quality": options.get("quality") or DEFAULT_IMAGE_QUALITY["jpeg"],
+            "optimize": "n" if profile == "fast" else "y",
+            "progressive": "y" if profile == "small" else "n",
+        },
+    }
+
+def encode_page(image, stream, options: dict):
+    """Encode a PIL page image into `stream` in the requested format and profile"""
+    image_format = options.get("format", "png")
+    profile = options.get("profile", "balanced")
+    if image_format == "jpeg":
+        image.save(
+            stream, "JPEG", quality=options.get("quality") or DEFAULT_IMAGE_QUALITY["jpeg"],
+            optimize=profile != "fast", progressive=profile == "small"
+        )
+    elif image_format == "webp":
+        image.save(
+            stream, "WEBP", quality=options.get("quality") or DEFAULT_IMAGE_QUALITY["webp"],
+            method={"fast": 0, "balanced": 4, "small": 6}[profile]
+        )
+    elif profile == "small":
+        image.save(stream, "PNG", optimize=True)
+    else:
+        image.save(stream, "PNG", compress_level=1 if profile == "fast" else 6)
 
-# Enhanced PDF to Images converter with multiple fallback methods
-async def pdf_to_images_converter(pdf_path: str, output_dir: str) -> List[str]:
-    """Convert PDF pages to images with enhanced error handling and fallbacks"""
+def render_scratch_dir(zip_path: str) -> str:
+    """Directory poppler renders into while building `zip_path`"""
+    return f"{zip_path}.pages"
+
+# PDF to Images converter: renders the document in page windows so that peak
+# memory depends on the window size rather than on the page count
+def pdf_to_images_converter(pdf_path: str, zip_path: str, options: Optional[dict] = None, probe: Optional[dict] = None, job_id: Optional[str] = None) -> int:
+    """Convert PDF pages to images and pack them into a ZIP.
+    
+    Only the selected pages are rendered. Each window of pages is rendered
+    (in parallel shards) and added to the archive before the next window
+    starts. In "direct" render mode poppler writes the image files into a
+    scratch directory next to the archive and they are copied in as-is; in
+    "pil" mode each page is decoded to a PIL image and encoded straight into
+    its archive entry. Images are already compressed, so they are stored
+    without deflating. Supported options (see build_image_options):
+    `pages`, `dpi`, `grayscale`, `max_width`, `max_height`, `format`,
+    `quality`, `profile`, `parallelism` (number of concurrent poppler
+    renders) and `render_mode` (default RENDER_MODE). `probe` is the
+    probe_pdf() record for the file; it is computed here if not given.
+    Returns the number of pages written, or 0 if the conversion failed (in
+    which case no archive is left behind).
+    """
+    options = options or {}
     if not PDF2IMAGE_AVAILABLE:
         print("PDF2IMAGE not available")
-        return []
+        return 0
     
     try:
         print(f"Converting PDF: {pdf_path}")
-        print(f"Output directory: {output_dir}")
-        print(f"Using poppler path: {POPPLER_PATH}")
+        print(f"Using poppler path: {get_poppler_path()}")
         
         # Validate PDF file first
-        if not validate_pdf_file(pdf_path):
+        probe = probe or probe_pdf(pdf_path)
+        if not probe["valid"] or probe["needs_password"]:
             print("PDF validation failed")
-            return []
+            return 0
+        page_ranges = resolve_page_ranges(options.get("pages"), probe["page_count"])
+        total_pages = sum(last - first + 1 for first, last in page_ranges)
+        if not total_pages:
+            print("No pages selected")
+            return 0
         
-        # Method 1: Try with explicit poppler path and conservative settings
-        images = None
-        
-        if POPPLER_PATH:
-            try:
-                print("Trying Method 1: With explicit poppler path")
-                images = convert_from_path(
-                    pdf_path, 
-                    dpi=150,  # Lower DPI to reduce memory usage
-                    poppler_path=POPPLER_PATH,
-                    first_page=1,
-                    last_page=None,
-                    thread_count=1,  # Single thread to avoid issues
-                    grayscale=False,
-                    size=None,
-                    transparent=False,
-                    single_file=False,
-                    output_folder=None,
-                    output_file=None,
-                    strict=False  # Less strict parsing
-                )
-                print(f"Method 1 successful: {len(images)} pages")
-            except Exception as e:
-                print(f"Method 1 failed: {e}")
-                images = None
+        parallelism = resolve_render_parallelism(options.get("parallelism"))
+        render_mode = resolve_render_mode(options)
+        dpi = resolve_render_dpi(probe, options)
+        settings = {"dpi": dpi, "grayscale": bool(options.get("grayscale"))}
+        if render_mode == "direct":
+            settings.update(poppler_output_settings(options))
+        extension = IMAGE_FORMATS[options.get("format", "png")]
+        window_pages = render_window_pages(probe, dpi, parallelism, render_mode)
+        strategy = {}
+        windows = [
+            (start, min(start + window_pages - 1, last))
+            for first, last in page_ranges
+            for start in range(first, last + 1, window_pages)
+        ]
+        print(f"Rendering {total_pages} pages at {dpi} DPI in {render_mode} mode with parallelism {parallelism}, {window_pages} pages per window")
         
-        # Method 2: Try without explicit poppler path
-        if images is None:
-            try:
-                print("Trying Method 2: Without explicit poppler path")
-                images = convert_from_path(
-                    pdf_path, 
-                    dpi=150,
-                    thread_count=1,
-                    strict=False
-                )
-                print(f"Method 2 successful: {len(images)} pages")
-            except Exception as e:
-                print(f"Method 2 failed: {e}")
-                images = None
+        report_progress(job_id, "render", 0, total_pages)
+        pages_written = 0
+        render_seconds = write_seconds = 0.0
+        started = time.perf_counter()
+        # The scratch directory sits next to the archive under a predictable
+        # name, so it can be removed even if this worker is killed
+        scratch_dir = render_scratch_dir(zip_path)
+        os.makedirs(scratch_dir, exist_ok=True)
+        # Render threads don't see this thread's guard, so hand it over
+        settings["marker"] = getattr(conversion_guard, "marker", None)
+        settings["deadline"] = getattr(conversion_guard, "deadline", None)
         
-        # Method 3: Try with bytes (load file into memory)
-        if images is None:
-            try:
-                print("Trying Method 3: Convert from bytes")
-                with open(pdf_path, 'rb') as pdf_file:
-                    pdf_bytes = pdf_file.read()
-                
-                if POPPLER_PATH:
-                    images = convert_from_bytes(
-                        pdf_bytes,
-                        dpi=150,
-                        poppler_path=POPPLER_PATH,
-                        thread_count=1,
-                        strict=False
-                    )
-                else:
-                    images = convert_from_bytes(
-                        pdf_bytes,
-                        dpi=150,
-                        thread_count=1,
-                        strict=False
+        try:
+            with ThreadPoolExecutor(max_workers=parallelism) as render_threads, \
+                    zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zipf:
+                output_folder = scratch_dir if render_mode == "direct" else None
+                for first_page, last_page in windows:
+                    check_cancelled()
+                    window_start = time.perf_counter()
+                    pages = render_window_parallel(
+                        render_threads, pdf_path, first_page, last_page, parallelism, strategy,
+                        output_folder, settings
                     )
-                print(f"Method 3 successful: {len(images)} pages")
-            except Exception as e:
-                print(f"Method 3 failed: {e}")
-                images = None
-        
-        # Method 4: Try page by page conversion (fallback for problematic PDFs)
-        if images is None:
-            try:
-                print("Trying Method 4: Page by page conversion")
-                images = []
-                page_num = 1
-                
-                while True:
-                    try:
-                        if POPPLER_PATH:
-                            page_images = convert_from_path(
-                                pdf_path,
-                                dpi=150,
-                                poppler_path=POPPLER_PATH,
-                                first_page=page_num,
-                                last_page=page_num,
-                                strict=False
-                            )
-                        else:
-                            page_images = convert_from_path(
-                                pdf_path,
-                                dpi=150,
-                                first_page=page_num,
-                                last_page=page_num,
-                                strict=False
-                            )
-                        
-                        if page_images:
-                            images.extend(page_images)
-                            print(f"Converted page {page_num}")
-                            page_num += 1
-                        else:
-                            break
-                            
-                        # Safety limit to prevent infinite loop
-                        if page_num > 1000:
-                            print("Reached page limit (1000)")
-                            break
-                            
-                    except Exception as e:
-                        print(f"Failed to convert page {page_num}: {e}")
+                    render_seconds += time.perf_counter() - window_start
+                    check_cancelled()
+                    
+                    if not pages:
+                        print(f"All conversion methods failed for pages {first_page}-{last_page}")
                         break
-                
-                if images:
-                    print(f"Method 4 successful: {len(images)} pages")
-            except Exception as e:
-                print(f"Method 4 failed: {e}")
-                images = None
-        
-        # If all methods failed
-        if not images:
-            print("All conversion methods failed")
-            return []
-        
-        # Save images
-        image_paths = []
+                    
+                    write_start = time.perf_counter()
+                    for page_num, page in enumerate(pages, start=first_page):
+                        image_filename = f"page_{page_num:03d}.{extension}"
+                        try:
+                            check_cancelled()
+                            if output_folder is not None:
+                                zipf.write(page, image_filename)
+                            else:
+                                # Encode the page directly into its archive entry
+                                with zipf.open(image_filename, 'w') as entry:
+                                    encode_page(page, entry, options)
+                            pages_written += 1
+                            report_progress(job_id, "render", pages_written, total_pages)
+                        except ConversionCancelled:
+                            raise
+                        except Exception as e:
+                            print(f"Failed to save page {page_num}: {e}")
+                        finally:
+                            # Free the page before moving on
+                            release_page(page)
+                    write_seconds += time.perf_counter() - write_start
+                    
+                    print(f"Added pages {first_page}-{last_page} to ZIP")
+                    
+                    if len(pages) < last_page - first_page + 1:
+                        # A shard stopped early on a broken page
+                        break
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
         
-        for i, image in enumerate(images):
-            try:
-                image_filename = f"page_{i+1:03d}.png"
-                image_path = os.path.join(output_dir, image_filename)
-                
-                # Save image with high quality
-                image.save(image_path, 'PNG', quality=95, optimize=True)
-                image_paths.append(image_path)
-                print(f"Saved page {i+1} as {image_filename}")
-                
-                # Close the image to free memory
-                image.close()
-                
-            except Exception as e:
-                print(f"Failed to save page {i+1}: {e}")
-                continue
+        # In direct mode poppler encodes while rendering and the write loop
+        # only copies files, so it counts as archive time
+        record_stage("render", render_seconds)
+        encode_seconds = write_seconds if render_mode == "pil" else 0.0
+        if render_mode == "pil":
+            record_stage("encode", encode_seconds)
+        # Whatever remains is archive bookkeeping: thread setup, entry headers, central directory
+        record_stage("zip", max(0.0, time.perf_counter() - started - render_seconds - encode_seconds))
         
-        return image_paths
+        if pages_written == 0 and os.path.exists(zip_path):
+            os.remove(zip_path)
+        return pages_written
         
+    except ConversionCancelled as e:
+        print(f"PDF to images conversion stopped: {e}")
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+        raise
     except Exception as e:
         print(f"PDF to images conversion error: {e}")
         import traceback
         traceback.print_exc()
-        return []
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+        return 0
+
+# Conversion executor
+def init_conversion_worker(queue):
+    """Pool initializer: hand the progress queue to the worker process and
+    import the dependencies of the CONVERTER_WARMUP converters"""
+    global progress_queue, in_conversion_worker
+    progress_queue = queue
+    in_conversion_worker = True
+    warm_up_converters(CONVERTER_WARMUP)
+
+def progress_due(job_id: str, stage: str, final: bool) -> bool:
+    """Whether a progress message for this job and stage may be sent now"""
+    key = (job_id, stage)
+    now = time.monotonic()
+    if final:
+        progress_sent.pop(key, None)
+        return True
+    if now - progress_sent.get(key, 0.0) < PROGRESS_INTERVAL:
+        return False
+    if len(progress_sent) > 1000:
+        # Entries of jobs that were cancelled mid-stage
+        progress_sent.clear()
+        progress_unsent.clear()
+    progress_sent[key] = now
+    return True
+
+def report_progress(job_id: Optional[str], stage: str, done: int = 0, total: Optional[int] = None):
+    """Report job progress from inside a converter (no-op outside a job).
+    Cheap enough to call per page: messages are throttled to PROGRESS_INTERVAL."""
+    if job_id is None or progress_queue is None:
+        return
+    if not progress_due(job_id, stage, total is not None and done >= total):
+        return
+    try:
+        progress_queue.put_nowait(("progress", job_id, stage, done, total))
+    except Exception as e:
+        print(f"Progress report failed: {e}")
+
+def report_pages(job_id: Optional[str], stage: str, pages: int, total: Optional[int] = None, flush: bool = False):
+    """Add `pages` to the done count of a stage whose pages are processed in
+    parallel chunks, throttled like report_progress; `flush` at chunk end"""
+    if job_id is None or progress_queue is None:
+        return
+    key = (job_id, stage)
+    pages += progress_unsent.pop(key, 0)
+    if not progress_due(job_id, stage, flush):
+        progress_unsent[key] = pages
+        return
+    try:
+        progress_queue.put_nowait(("pages", job_id, stage, pages, total))
+    except Exception as e:
+        print(f"Progress report failed: {e}")
+
+def pump_progress(loop: asyncio.AbstractEventLoop, queue):
+    """Forward progress and metrics messages from pool workers to the event loop"""
+    while True:
+        try:
+            message = queue.get()
+        except Exception:
+            break  # Queue of a replaced pool, closed under us
+        if message is None:
+            break
+        kind, *args = message
+        if kind == "progress":
+            loop.call_soon_threadsafe(apply_progress, *args)
+        elif kind == "pages":
+            loop.call_soon_threadsafe(apply_pages, *args)
+        elif kind == "worker":
+            loop.call_soon_threadsafe(note_conversion_worker, *args)
+        elif kind == "stage":
+            observe("conversion_stage_seconds", args[1], stage=args[0])
+
+def apply_progress(job_id: str, stage: str, done: int, total: Optional[int]):
+    """Record a progress message on its job"""
+    job = JOBS.get(job_id)
+    if job is None or job["state"] not in ("queued", "running"):
+        return
+    job["state"] = "running"
+    job["stage"] = stage
+    job["progress"] = {"done": done, "total": total}
+    job["updated_at"] = datetime.now().isoformat()
+    notify_job(job_id)
+
+def apply_pages(job_id: str, stage: str, pages: int, total: Optional[int]):
+    """Record a page count increment on its job; the stage is started by the
+    API process, so increments arriving after it has moved on are dropped"""
+    job = JOBS.get(job_id)
+    if job is None or job["stage"] != stage:
+        return
+    apply_progress(job_id, stage, job["progress"]["done"] + pages, total)
+
+def notify_job(job_id: str):
+    """Wake the event streams watching a job"""
+    event = job_watchers.pop(job_id, None)
+    if event is not None:
+        event.set()
+
+def start_conversion_pool():
+    """Start the process pool that runs all CPU-heavy conversion work"""
+    global conversion_pool, progress_queue
+    if conversion_pool is None:
+        # Workers are forked from a single-threaded fork server: forking the
+        # API process itself while request threads hold locks can deadlock them
+        context = multiprocessing.get_context("forkserver")
+        progress_queue = context.Queue()
+        conversion_pool = ProcessPoolExecutor(
+            max_workers=CONVERSION_WORKERS,
+            mp_context=context,
+            initializer=init_conversion_worker,
+            initargs=(progress_queue,)
+        )
+        threading.Thread(
+            target=pump_progress,
+            args=(asyncio.get_running_loop(), progress_queue),
+            daemon=True
+        ).start()
+        print(f"Conversion pool started with {CONVERSION_WORKERS} workers")
+
+def stop_conversion_pool():
+    """Shut down the conversion process pool"""
+    global conversion_pool, progress_queue
+    if conversion_pool is not None:
+        conversion_pool.shutdown(wait=True, cancel_futures=True)
+        conversion_pool = None
+    if progress_queue is not None:
+        progress_queue.put(None)
+        progress_queue = None
+
+# Cancellation
+class ConversionCancelled(Exception):
+    """Raised inside a converter whose conversion was cancelled or ran out of time"""
+
+def remaining_budget(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left until a wall-clock deadline (None for no deadline)"""
+    if deadline is None:
+        return None
+    return max(0.1, deadline - time.time())
+
+def deadline_passed(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.time() > deadline
+
+def render_cancelled(settings: Optional[dict]) -> bool:
+    """Whether the conversion behind a render call's settings was cancelled"""
+    settings = settings or {}
+    marker = settings.get("marker")
+    return deadline_passed(settings.get("deadline")) or (marker is not None and os.path.exists(marker))
+
+def check_cancelled():
+    """Stop the converter call running in this thread if its conversion was
+    cancelled or is past its deadline (no-op outside run_conversion)"""
+    if deadline_passed(getattr(conversion_guard, "deadline", None)):
+        raise ConversionCancelled("time limit exceeded")
+    marker = getattr(conversion_guard, "marker", None)
+    if marker is not None and os.path.exists(marker):
+        raise ConversionCancelled("cancelled")
+
+def guarded_call(marker: str, deadline: float, func, *args):
+    """Pool entry point: run func(*args) under a cancel marker and deadline"""
+    conversion_guard.marker = marker
+    conversion_guard.deadline = deadline
+    if progress_queue is not None:
+        try:
+            progress_queue.put_nowait(("worker", marker, os.getpid()))
+        except Exception as e:
+            print(f"Worker report failed: {e}")
+    try:
+        return func(*args)
+    finally:
+        conversion_guard.marker = conversion_guard.deadline = None
+
+def note_conversion_worker(marker: str, pid: int):
+    """Record which worker runs a call, unless the call has already finished"""
+    if marker in conversion_workers:
+        conversion_workers[marker] = pid
+
+def track_outputs(*paths: str):
+    """Remember output paths of the current conversion; run_pipeline removes
+    them if the conversion does not complete"""
+    scope = conversion_scope.get()
+    if scope is not None:
+        scope["outputs"].extend(paths)
+
+def cancel_conversion(scope: dict, reason: str):
+    if scope["cancelled"] is None:
+        scope["cancelled"] = reason
+        inc_counter("conversions_cancelled_total", converter=scope["converter"], reason=reason)
+        print(f"Cancelling {scope['converter']} conversion: {reason}")
+
+async def poll_cancellation(scope: dict) -> bool:
+    """Check a conversion's deadline and client; True once it is cancelled"""
+    if scope["cancelled"] is None:
+        if deadline_passed(scope["deadline"]):
+            cancel_conversion(scope, "timeout")
+        elif scope["request"] is not None and await scope["request"].is_disconnected():
+            cancel_conversion(scope, "disconnected")
+    return scope["cancelled"] is not None
+
+def raise_if_cancelled(scope: Optional[dict]):
+    """Raise the HTTP error for a cancelled or overdue conversion"""
+    if scope is None:
+        return
+    if scope["cancelled"] is None and deadline_passed(scope["deadline"]):
+        cancel_conversion(scope, "timeout")
+    if scope["cancelled"] == "timeout":
+        raise HTTPException(
+            status_code=504,
+            detail=f"Conversion exceeded its time limit of {scope['limit']} seconds"
+        )
+    if scope["cancelled"] == "disconnected":
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
+
+def request_stop(marker: str):
+    """Ask the converter call behind a cancel marker to stop at its next check"""
+    try:
+        open(marker, "a").close()
+    except OSError as e:
+        print(f"Could not write cancel marker: {e}")
+
+def child_pids(pid: int) -> List[int]:
+    """Child processes of a process (Linux only; empty elsewhere)"""
+    children = []
+    try:
+        for thread_id in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{thread_id}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return children
+
+def kill_processes(pids: List[int]):
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+def restart_conversion_pool(broken: Optional[ProcessPoolExecutor]):
+    """Replace the conversion pool after one of its workers died"""
+    global conversion_pool, progress_queue
+    if broken is None or conversion_pool is not broken:
+        return  # Already replaced
+    print("Restarting the conversion pool")
+    # Queued and running calls fail with BrokenProcessPool and are retried
+    broken.shutdown(wait=False)
+    conversion_pool = None
+    if progress_queue is not None:
+        # The killed worker may have held the queue's lock: use a fresh queue
+        try:
+            progress_queue.put_nowait(None)
+        except Exception:
+            pass
+        progress_queue = None
+    start_conversion_pool()
+
+def conversion_worker_pid(marker: str, pool: Optional[ProcessPoolExecutor]) -> Optional[int]:
+    """Pid of the pool worker running a call, if known"""
+    pid = conversion_workers.get(marker)
+    if pool is None or pid is None or pid == os.getpid():
+        return None  # Thread fallback: never signal the API process itself
+    return pid
+
+def stop_conversion_call(marker: str, pool: Optional[ProcessPoolExecutor]):
+    """Ask a converter call to stop, and kill the poppler processes it is
+    waiting on so it does not finish the current page window first"""
+    request_stop(marker)
+    pid = conversion_worker_pid(marker, pool)
+    if pid is not None:
+        kill_processes(child_pids(pid))
+
+def kill_conversion_worker(marker: str, pool: Optional[ProcessPoolExecutor]):
+    """Kill the pool worker running a call that ignored its cancel marker"""
+    pid = conversion_worker_pid(marker, pool)
+    if pid is None:
+        print("Cancelled conversion did not stop and its worker is unknown")
+        return
+    print(f"Killing conversion worker {pid}")
+    children = child_pids(pid)
+    kill_processes([pid] + children)
+    inc_counter("conversion_workers_killed_total")
+    restart_conversion_pool(pool)
+
+async def await_conversion(future: asyncio.Future, scope: dict, marker: str, pool: Optional[ProcessPoolExecutor]):
+    """Wait for a converter call, stopping it if its conversion is cancelled.
+    
+    The call is first asked to stop through its cancel marker and its poppler
+    processes are killed; if it is still running CONVERSION_KILL_GRACE
+    seconds later its worker is killed too.
+    """
+    stop_requested = None
+    try:
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=CANCEL_POLL_INTERVAL)
+            if done:
+                return future.result()
+            if not await poll_cancellation(scope):
+                continue
+            if stop_requested is None:
+                stop_conversion_call(marker, pool)
+                stop_requested = time.time()
+            elif time.time() - stop_requested > CONVERSION_KILL_GRACE:
+                kill_conversion_worker(marker, pool)
+                break
+    except asyncio.CancelledError:
+        request_stop(marker)
+        raise
+    # Don't wait for the killed call; just collect its BrokenProcessPool error
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    raise_if_cancelled(scope)
+
+async def run_conversion(converter: str, func, *args, job_id: Optional[str] = None):
+    """Run a blocking converter function off the event loop.
+    
+    Work is sent to the conversion process pool, and at most
+    CONVERTER_LIMITS[converter] calls of that converter type run at once.
+    Without a pool (e.g. the lifespan has not run) the default thread
+    executor is used instead. Inside run_pipeline the call is cancelled
+    when the client disconnects or the conversion's time limit runs out,
+    raising the matching HTTPException.
+    """
+    scope = conversion_scope.get()
+    conversions_queued[converter] += 1
+    admitted = False
+    try:
+        async with converter_semaphores[converter]:
+            conversions_queued[converter] -= 1
+            admitted = True
+            conversions_active[converter] += 1
+            try:
+                if scope is not None and await poll_cancellation(scope):
+                    raise_if_cancelled(scope)
+                if job_id is not None and JOBS.get(job_id, {}).get("stage") is None:
+                    # Later calls of a multi-stage job keep the progress of the stage before
+                    apply_progress(job_id, "started", 0, None)
+                loop = asyncio.get_running_loop()
+                if scope is None:
+                    return await loop.run_in_executor(conversion_pool, func, *args)
+                for attempt in range(2):
+                    pool = conversion_pool
+                    marker = os.path.join(tempfile.gettempdir(), f"conversion-{uuid.uuid4().hex}.cancel")
+                    conversion_workers[marker] = None
+                    try:
+                        future = loop.run_in_executor(pool, guarded_call, marker, scope["deadline"], func, *args)
+                        result = await await_conversion(future, scope, marker, pool)
+                        break
+                    except ConversionCancelled:
+                        # The converter noticed first
+                        raise_if_cancelled(scope)
+                        raise
+                    except BrokenProcessPool:
+                        # Another conversion's worker was killed: retry once on the new pool
+                        restart_conversion_pool(pool)
+                        raise_if_cancelled(scope)
+                        if attempt:
+                            raise
+                        print(f"Conversion pool broke, retrying {converter} call")
+                    finally:
+                        conversion_workers.pop(marker, None)
+                        if os.path.exists(marker):
+                            os.remove(marker)
+                raise_if_cancelled(scope)
+                return result
+            finally:
+                conversions_active[converter] -= 1
+    finally:
+        if not admitted:
+            conversions_queued[converter] -= 1
+
+# Metrics
+def metric_key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted(labels.items())))
+
+def inc_counter(name: str, value: float = 1.0, **labels):
+    """Increment a counter metric"""
+    key = metric_key(name, labels)
+    with metrics_lock:
+        metric_counters[key] = metric_counters.get(key, 0.0) + value
+
+def observe(name: str, value: float, **labels):
+    """Record an observation in a histogram metric"""
+    buckets = METRIC_BUCKETS.get(name, METRIC_BUCKETS["default"])
+    key = metric_key(name, labels)
+    with metrics_lock:
+        entry = metric_histograms.setdefault(key, [[0] * len(buckets), 0.0, 0])
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                entry[0][i] += 1
+        entry[1] += value
+        entry[2] += 1
+
+def record_stage(stage: str, seconds: float):
+    """Record the duration of a conversion stage, from the API process or a pool worker"""
+    if in_conversion_worker and progress_queue is not None:
+        try:
+            progress_queue.put_nowait(("stage", stage, seconds))
+        except Exception as e:
+            print(f"Metrics report failed: {e}")
+    else:
+        observe("conversion_stage_seconds", seconds, stage=stage)
+
+def process_rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux /proc), or None if unavailable"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text exposition format"""
+    lines = []
+    
+    def header(name: str, metric_type: str, help_text: str):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+    
+    with metrics_lock:
+        counters = sorted(metric_counters.items())
+        histograms = sorted((key, [list(entry[0]), entry[1], entry[2]]) for key, entry in metric_histograms.items())
+    
+    seen = set()
+    for (name, labels), value in counters:
+        if name not in seen:
+            seen.add(name)
+            header(name, *METRIC_HELP[name])
+        lines.append(f"{name}{format_labels(labels)} {value}")
+    
+    for (name, labels), (bucket_counts, total, count) in histograms:
+        if name not in seen:
+            seen.add(name)
+            header(name, *METRIC_HELP[name])
+        buckets = METRIC_BUCKETS.get(name, METRIC_BUCKETS["default"])
+        for bound, bucket_count in zip(buckets, bucket_counts):
+            lines.append(f"{name}_bucket{format_labels(labels + (('le', str(bound)),))} {bucket_count}")
+        lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {count}")
+        lines.append(f"{name}_sum{format_labels(labels)} {total}")
+        lines.append(f"{name}_count{format_labels(labels)} {count}")
+    
+    header("conversions_active", "gauge", "Conversions currently running in the pool")
+    for converter, value in conversions_active.items():
+        lines.append(f'conversions_active{{converter="{converter}"}} {value}')
+    header("conversions_queued", "gauge", "Conversions waiting for a converter slot")
+    for converter, value in conversions_queued.items():
+        lines.append(f'conversions_queued{{converter="{converter}"}} {value}')
+    
+    header("jobs", "gauge", "Tracked jobs by state")
+    for state in ("queued", "running", "completed", "failed"):
+        count = sum(1 for job in JOBS.values() if job["state"] == state)
+        lines.append(f'jobs{{state="{state}"}} {count}')
+    
+    header("conversion_cache_events_total", "counter", "Result cache hits, misses and evictions")
+    for event, value in cache_stats.items():
+        lines.append(f'conversion_cache_events_total{{event="{event}"}} {value}')
+    
+    header("admission_memory_bytes", "gauge", "Estimated memory of admitted conversions")
+    lines.append(f"admission_memory_bytes {admission_usage['memory']}")
+    header("admission_cpu", "gauge", "Estimated CPUs used by admitted conversions")
+    lines.append(f"admission_cpu {admission_usage['cpu']}")
+    header("admission_waiting", "gauge", "Conversions waiting for admission")
+    lines.append(f"admission_waiting {len(admission_waiters)}")
+    
+    header("upload_dir_bytes", "gauge", "Bytes used by tracked artifacts in UPLOAD_DIR")
+    lines.append(f"upload_dir_bytes {artifact_bytes}")
+    
+    rss = process_rss_bytes()
+    if rss is not None:
+        header("process_resident_memory_bytes", "gauge", "Resident memory of the API process")
+        lines.append(f"process_resident_memory_bytes {rss}")
+    
+    return "\n".join(lines) + "\n"
+
+async def monitor_event_loop_lag():
+    """Background task sampling how late the event loop wakes a sleeping task"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(EVENT_LOOP_LAG_INTERVAL)
+        observe("event_loop_lag_seconds", max(0.0, loop.time() - start - EVENT_LOOP_LAG_INTERVAL))
+
+# Admission control
+def render_window_pages(probe: dict, dpi: int, parallelism: int, render_mode: str) -> int:
+    """Pages per pdf-to-images render window"""
+    if render_mode == "pil":
+        # Size windows so the decoded pages in flight stay under the memory
+        # budget, but give every shard at least one page per window
+        window_pages = max(1, min(
+            RENDER_WINDOW_PAGES, RENDER_WINDOW_MAX_BYTES // estimate_page_bytes(probe, dpi)
+        ))
+    else:
+        # Pages never reach Python memory; the window only bounds scratch disk use
+        window_pages = RENDER_WINDOW_PAGES
+    return max(window_pages, parallelism)
+
+def estimate_conversion_cost(converter: str, input_bytes: int, probe: Optional[dict] = None, options: Optional[dict] = None) -> tuple:
+    """Estimated peak (memory bytes, CPUs) of a conversion.
+    
+    Rendering is priced from page size x DPI for the pages held at once:
+    one per poppler process, plus the decoded window in PIL mode. The text
+    and document paths are priced from the input size.
+    """
+    options = options or {}
+    if converter == "pdf-to-images" and probe is not None:
+        dpi = resolve_render_dpi(probe, options)
+        parallelism = resolve_render_parallelism(options.get("parallelism"))
+        render_mode = resolve_render_mode(options)
+        pages_in_memory = parallelism
+        if render_mode == "pil":
+            pages_in_memory += render_window_pages(probe, dpi, parallelism, render_mode)
+        memory = CONVERSION_BASE_MEMORY + pages_in_memory * estimate_page_bytes(probe, dpi)
+        return memory, float(parallelism)
+    
+    cpu = 1.0
+    if converter == "pdf-to-word" and probe is not None:
+        # Text is extracted in parallel chunks on the pool
+        cpu = float(min(CONVERSION_WORKERS, max(1, math.ceil(probe["page_count"] / PDF_TEXT_CHUNK_PAGES))))
+    return CONVERSION_BASE_MEMORY + input_bytes * TEXT_MEMORY_FACTOR, cpu
+
+def admission_fits(memory: int, cpu: float) -> bool:
+    # A conversion larger than the whole budget is admitted once nothing else runs
+    if admission_usage["memory"] == 0 and admission_usage["cpu"] == 0:
+        return True
+    return (admission_usage["memory"] + memory <= ADMISSION_MEMORY_BUDGET
+            and admission_usage["cpu"] + cpu <= ADMISSION_CPU_BUDGET)
+
+def grant_admissions():
+    """Admit waiting conversions in arrival order while they fit"""
+    while admission_waiters:
+        memory, cpu, future = admission_waiters[0]
+        if future.done():
+            admission_waiters.popleft()
+            continue
+        if not admission_fits(memory, cpu):
+            break
+        admission_waiters.popleft()
+        admission_usage["memory"] += memory
+        admission_usage["cpu"] += cpu
+        future.set_result(None)
+
+def leave_admission_queue():
+    """Stop counting the current request as waiting at the door"""
+    global admission_pending
+    ticket = admission_ticket.get()
+    if ticket is not None and ticket["pending"]:
+        ticket["pending"] = False
+        admission_pending -= 1
+
+@asynccontextmanager
+async def admission(memory: int, cpu: float):
+    """Hold an admission slot of the given estimated cost for the enclosed conversion"""
+    started = time.perf_counter()
+    if not admission_waiters and admission_fits(memory, cpu):
+        admission_usage["memory"] += memory
+        admission_usage["cpu"] += cpu
+    else:
+        future = asyncio.get_running_loop().create_future()
+        admission_waiters.append((memory, cpu, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Admitted just as we were cancelled: hand the slot back
+                admission_usage["memory"] -= memory
+                admission_usage["cpu"] -= cpu
+                grant_admissions()
+            raise
+    waited = time.perf_counter() - started
+    observe("admission_wait_seconds", waited)
+    scope = conversion_scope.get()
+    if scope is not None:
+        # Queueing for the budget does not count against the time limit
+        scope["deadline"] += waited
+    leave_admission_queue()
+    try:
+        yield
+    finally:
+        admission_usage["memory"] -= memory
+        admission_usage["cpu"] -= cpu
+        grant_admissions()
+
+def admission_queue_full() -> bool:
+    # Synchronous requests between the door and admission; queued jobs are not counted
+    return admission_pending >= ADMISSION_QUEUE_LIMIT
 
 # Lifespan event handler
 @asynccontextmanager
@@ -292,20 +1461,26 @@ async def lifespan(app: FastAPI):
     # Startup
     print("PDF Converter API started successfully!")
     print(f"Upload directory: {UPLOAD_DIR}")
+    print(f"Artifact store: {ARTIFACT_BACKEND} (index {ARTIFACT_INDEX_PATH})")
     print("Available dependencies:")
     print(f"  - aiofiles: {AIOFILES_AVAILABLE}")
     print(f"  - PyPDF2: {PYPDF2_AVAILABLE}")
     print(f"  - reportlab: {REPORTLAB_AVAILABLE}")
     print(f"  - python-docx: {DOCX_AVAILABLE}")
     print(f"  - pdf2image: {PDF2IMAGE_AVAILABLE}")
-    if POPPLER_PATH:
-        print(f"  - poppler path: {POPPLER_PATH}")
-    else:
-        print("  - poppler: NOT FOUND")
-    cleanup_old_files()
+    # Poppler is located the first time it is needed
+    if CONVERTER_WARMUP:
+        print(f"Pool workers warm up: {', '.join(CONVERTER_WARMUP)}")
+    await rebuild_artifact_index()
+    janitor_task = asyncio.create_task(janitor_loop())
+    lag_task = asyncio.create_task(monitor_event_loop_lag())
+    start_conversion_pool()
     yield
     # Shutdown
     print("Shutting down PDF Converter API...")
+    janitor_task.cancel()
+    lag_task.cancel()
+    stop_conversion_pool()
 
 # Create FastAPI app with lifespan
 app = FastAPI(
@@ -324,42 +1499,286 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Both middlewares are plain ASGI: starlette's @app.middleware("http") runs
+# the endpoint behind a wrapper that never passes on http.disconnect, and
+# cancelling conversions of clients that went away depends on seeing it
+class AdmissionDoor:
+    """Turn conversion requests away before their upload is read when the admission queue is full"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        global admission_pending
+        if (scope["type"] != "http" or scope["method"] != "POST"
+                or not scope["path"].startswith(("/convert/", "/jobs/"))):
+            await self.app(scope, receive, send)
+            return
+        if admission_queue_full():
+            inc_counter("admission_rejected_total")
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy. Try again later."},
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER)}
+            )
+            await response(scope, receive, send)
+            return
+        ticket = {"pending": True}
+        admission_ticket.set(ticket)
+        admission_pending += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if ticket["pending"]:
+                ticket["pending"] = False
+                admission_pending -= 1
+
+class RequestMetrics:
+    """Count requests and time them per endpoint"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+        
+        async def send_and_record_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_and_record_status)
+        finally:
+            route = scope.get("route")
+            endpoint = route.path if route is not None else "unmatched"
+            observe("http_request_duration_seconds", time.perf_counter() - start, endpoint=endpoint)
+            inc_counter("http_requests_total", endpoint=endpoint, method=scope["method"], status=str(status_code))
+
+app.add_middleware(AdmissionDoor)
+app.add_middleware(RequestMetrics)
+
 # Utility Functions
-def cleanup_old_files():
-    """Remove files older than 1 hour"""
-    try:
-        for filename in os.listdir(UPLOAD_DIR):
-            filepath = os.path.join(UPLOAD_DIR, filename)
-            if os.path.isfile(filepath):
-                file_age = time.time() - os.path.getctime(filepath)
-                if file_age > 3600:  # 1 hour
-                    os.remove(filepath)
+def path_size(path: str) -> int:
+    """Size of a file, or the total size of the files under a directory"""
+    if os.path.isdir(path):
+        return sum(
+            os.path.getsize(os.path.join(root, name))
+            for root, _, names in os.walk(path) for name in names
+        )
+    return os.path.getsize(path)
+
+def register_artifact(path: str, expires_at: Optional[float] = None, size: Optional[int] = None, in_use: bool = False):
+    """Track a file or directory under UPLOAD_DIR for expiry.
+    
+    An artifact registered `in_use` is skipped by the janitor until its
+    owner removes it with remove_files, however old it gets.
+    """
+    global artifact_bytes
+    if expires_at is None:
+        expires_at = time.time() + ARTIFACT_TTL
+    if size is None:
+        try:
+            size = path_size(path)
+        except OSError:
+            return
+    forget_artifact(path)
+    artifact_bytes += size
+    artifact_index[path] = (expires_at, size)
+    heapq.heappush(artifact_heap, (expires_at, path))
+    if in_use:
+        artifacts_in_use.add(path)
+
+def forget_artifact(path: str):
+    """Stop tracking an artifact (it was removed by its owner)"""
+    global artifact_bytes
+    _, size = artifact_index.pop(path, (None, 0))
+    artifacts_in_use.discard(path)
+    artifact_bytes -= size
+
+def scan_upload_dir() -> List[tuple]:
+    """List (expires_at, path, size) for everything in UPLOAD_DIR, based on mtime"""
+    entries = []
+    for name in os.listdir(UPLOAD_DIR):
+        path = os.path.join(UPLOAD_DIR, name)
+        try:
+            entries.append((os.path.getmtime(path) + ARTIFACT_TTL, path, path_size(path)))
+        except OSError:
+            continue
+    return entries
+
+async def rebuild_artifact_index():
+    """Rebuild the expiry index from what is on disk (run at startup)"""
+    try:
+        entries = await asyncio.to_thread(scan_upload_dir)
     except Exception as e:
-        print(f"Cleanup error: {e}")
+        print(f"Janitor index rebuild failed: {e}")
+        return
+    for expires_at, path, size in entries:
+        register_artifact(path, expires_at, size)
+    print(f"Janitor tracking {len(artifact_index)} artifacts ({artifact_bytes // (1024*1024)}MB)")
+
+def delete_artifacts(paths: List[str]):
+    """Remove files and directories from disk"""
+    for path in paths:
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            elif os.path.exists(path):
+                os.remove(path)
+        except Exception as e:
+            print(f"Cleanup error: {e}")
+
+def pop_artifact_batch(now: float) -> List[str]:
+    """Take up to JANITOR_BATCH artifacts that are expired or over the quota,
+    skipping those still in use"""
+    batch = []
+    in_use = []
+    while artifact_heap and len(batch) < JANITOR_BATCH:
+        expires_at, path = artifact_heap[0]
+        if artifact_index.get(path, (None,))[0] != expires_at:
+            heapq.heappop(artifact_heap)  # stale entry for a forgotten or re-registered artifact
+            continue
+        if expires_at > now and artifact_bytes <= UPLOAD_QUOTA_BYTES:
+            break
+        heapq.heappop(artifact_heap)
+        if path in artifacts_in_use:
+            in_use.append((expires_at, path))  # looked at again on the next pass
+            continue
+        forget_artifact(path)
+        batch.append(path)
+    for entry in in_use:
+        heapq.heappush(artifact_heap, entry)
+    return batch
+
+async def janitor_sweep():
+    """Remove expired scratch files and artifacts, then the oldest ones until under the quotas"""
+    now = time.time()
+    removed = 0
+    while True:
+        batch = pop_artifact_batch(now)
+        if not batch:
+            break
+        await asyncio.to_thread(delete_artifacts, batch)
+        removed += len(batch)
+    removed += await asyncio.to_thread(sweep_artifact_store)
+    if removed:
+        print(f"Janitor removed {removed} artifacts")
+
+async def janitor_loop():
+    """Background task that sweeps UPLOAD_DIR and the artifact store every JANITOR_INTERVAL seconds"""
+    while True:
+        try:
+            await janitor_sweep()
+        except Exception as e:
+            print(f"Janitor error: {e}")
+        await asyncio.sleep(JANITOR_INTERVAL)
+
+def get_client_ip(request: Request) -> str:
+    """The address of the real client, honouring X-Forwarded-For behind
+    TRUSTED_PROXY_HOPS trusted proxies"""
+    if TRUST_PROXY_HEADERS:
+        forwarded = [entry.strip() for entry in request.headers.get("x-forwarded-for", "").split(",")]
+        forwarded = [entry for entry in forwarded if entry]
+        # A shorter header did not come through all the proxies: don't trust it
+        if TRUSTED_PROXY_HOPS > 0 and len(forwarded) >= TRUSTED_PROXY_HOPS:
+            return forwarded[-TRUSTED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+def rate_limit_connection() -> sqlite3.Connection:
+    """Per-thread connection to the shared rate limit store"""
+    conn = getattr(rate_limit_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(RATE_LIMIT_DB, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT PRIMARY KEY,
+                window_start REAL NOT NULL,
+                current INTEGER NOT NULL,
+                previous INTEGER NOT NULL
+            )"""
+        )
+        rate_limit_local.conn = conn
+    return conn
 
-def check_rate_limit(client_ip: str):
-    """Simple rate limiting"""
-    current_time = time.time()
+def rate_limit_hit(key: str, limit: int, window: int, now: float) -> float:
+    """Count one request against `key`; return 0 if allowed, else seconds until retry.
     
-    # Clean old requests
-    request_counts[client_ip] = [
-        req_time for req_time in request_counts[client_ip]
-        if current_time - req_time < RATE_WINDOW
-    ]
+    Uses a sliding window counter: the previous fixed window's count is
+    weighted by how much of it still overlaps the sliding window, so each
+    check is a single-row read and write regardless of the request rate.
+    """
+    global rate_limit_last_evict
+    window_start = now - (now % window)
+    conn = rate_limit_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT window_start, current, previous FROM rate_limits WHERE key = ?", (key,)
+        ).fetchone()
+        current, previous = 0, 0
+        if row is not None:
+            if row[0] == window_start:
+                current, previous = row[1], row[2]
+            elif row[0] == window_start - window:
+                previous = row[1]
+        
+        remaining = window - (now - window_start)  # part of the previous window still in view
+        estimate = previous * remaining / window + current
+        retry_after = 0.0
+        if estimate >= limit:
+            if current >= limit or previous == 0:
+                retry_after = remaining
+            else:
+                retry_after = remaining - (limit - current) * window / previous
+            retry_after = max(1.0, retry_after)
+        else:
+            current += 1
+        
+        conn.execute(
+            "INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?)",
+            (key, window_start, current, previous)
+        )
+        
+        # Drop keys that have been idle for two full windows
+        if now - rate_limit_last_evict > RATE_LIMIT_EVICT_INTERVAL:
+            rate_limit_last_evict = now
+            conn.execute(
+                "DELETE FROM rate_limits WHERE window_start < ?", (window_start - window,)
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return retry_after
+
+async def check_rate_limit(request: Request, endpoint: str):
+    """Rate limit a client on an endpoint, raising 429 with Retry-After when exceeded"""
+    key = f"{endpoint}:{get_client_ip(request)}"
+    limit = RATE_LIMITS.get(endpoint, RATE_LIMIT)
+    try:
+        retry_after = await asyncio.to_thread(rate_limit_hit, key, limit, RATE_WINDOW, time.time())
+    except sqlite3.Error as e:
+        # Fail open: a broken limiter store should not take the API down
+        print(f"Rate limit store error: {e}")
+        return
     
-    # Check rate limit
-    if len(request_counts[client_ip]) >= RATE_LIMIT:
+    if retry_after:
         raise HTTPException(
             status_code=429,
-            detail="Rate limit exceeded. Try again later."
+            detail="Rate limit exceeded. Try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))}
         )
-    
-    # Add current request
-    request_counts[client_ip].append(current_time)
 
 def validate_file_size(file: UploadFile):
-    """Validate file size"""
-    if hasattr(file, 'size') and file.size > MAX_FILE_SIZE:
+    """Reject uploads whose declared size is too large (save_upload enforces the limit while reading)"""
+    if getattr(file, 'size', None) is not None and file.size > MAX_FILE_SIZE:
         raise HTTPException(
             status_code=413,
             detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB"
@@ -374,83 +1793,374 @@ def generate_unique_filename(original_filename: str, extension: str = None) -> s
         return f"{uuid.uuid4()}{ext}"
 
 # Conversion Functions
-async def pdf_to_word_converter(pdf_path: str, output_path: str) -> bool:
-    """Convert PDF to Word document"""
-    if not PYPDF2_AVAILABLE or not DOCX_AVAILABLE:
-        return False
+def extract_text_chunk(pdf_path: str, start: int, end: int, job_id: Optional[str] = None, total: Optional[int] = None) -> List[str]:
+    """Extract the text of pages start..end-1 (0-based) from a PDF.
+    Pages are counted towards the job's "extract" stage out of `total`."""
+    import PyPDF2
+    
+    started = time.perf_counter()
+    with open(pdf_path, 'rb') as pdf_file:
+        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        if pdf_reader.is_encrypted:
+            pdf_reader.decrypt("")
+        texts = []
+        for i in range(start, end):
+            check_cancelled()
+            texts.append(pdf_reader.pages[i].extract_text() or "")
+            report_pages(job_id, "extract", 1, total, flush=i == end - 1)
+    record_stage("extract", time.perf_counter() - started)
+    return texts
+
+def build_word_document(page_texts: List[str], output_path: str, job_id: Optional[str] = None) -> bool:
+    """Write extracted page texts into a Word document"""
+    from docx import Document
     
     try:
+        total = len(page_texts)
+        report_progress(job_id, "build", 0, total)
+        started = time.perf_counter()
+        
         # Create new Word document
         doc = Document()
         doc.add_heading('Converted from PDF', 0)
         
-        # Read PDF and extract text
-        with open(pdf_path, 'rb') as pdf_file:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            
-            for page_num, page in enumerate(pdf_reader.pages):
-                text = page.extract_text()
-                if text.strip():
-                    doc.add_heading(f'Page {page_num + 1}', level=1)
-                    doc.add_paragraph(text)
-                else:
-                    doc.add_paragraph(f"[Page {page_num + 1} - No extractable text]")
+        for page_num, text in enumerate(page_texts):
+            check_cancelled()
+            if text.strip():
+                doc.add_heading(f'Page {page_num + 1}', level=1)
+                doc.add_paragraph(text)
+            else:
+                doc.add_paragraph(f"[Page {page_num + 1} - No extractable text]")
+            report_progress(job_id, "build", page_num + 1, total)
         
         # Save Word document
         doc.save(output_path)
+        record_stage("build_docx", time.perf_counter() - started)
         return True
         
     except Exception as e:
         print(f"PDF to Word conversion error: {e}")
         return False
 
-async def word_to_pdf_converter(word_path: str, output_path: str) -> bool:
-    """Convert Word document to PDF"""
+def stop_if_cancelled(pdf_canvas, doc):
+    """reportlab page callback that aborts the build of a cancelled conversion"""
+    check_cancelled()
+
+def word_pdf_stylesheet() -> dict:
+    """The reportlab styles used by word-to-pdf, shared by every conversion
+    in this process. Headings keep with the paragraph that follows them."""
+    global word_pdf_styles
+    if word_pdf_styles is None:
+        from reportlab.lib import colors
+        from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+        from reportlab.platypus import TableStyle
+        
+        sample = getSampleStyleSheet()
+        styles = {"Normal": sample["Normal"]}
+        for name in ("Title", "Heading1", "Heading2", "Heading3", "Heading4", "Heading5", "Heading6"):
+            styles[name] = ParagraphStyle(f"Word{name}", parent=sample[name], keepWithNext=1)
+        styles["cell"] = ParagraphStyle("WordCell", parent=sample["Normal"], fontSize=9, leading=11)
+        styles["table"] = TableStyle([
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ])
+        word_pdf_styles = styles
+    return word_pdf_styles
+
+def word_markup(text: str) -> str:
+    """Paragraph markup for plain docx text: XML-escaped, line breaks kept"""
+    return escape(text).replace("\n", "<br/>")
+
+def word_paragraph_style(paragraph, styles: dict, cache: dict):
+    """The reportlab style for a docx paragraph, resolved once per docx style"""
+    style_id = paragraph._p.style
+    if style_id not in cache:
+        name = paragraph.style.name if paragraph.style is not None else ""
+        if name == "Title":
+            cache[style_id] = styles["Title"]
+        elif name.startswith("Heading ") and name[8:].isdigit():
+            cache[style_id] = styles[f"Heading{min(max(int(name[8:]), 1), 6)}"]
+        else:
+            cache[style_id] = styles["Normal"]
+    return cache[style_id]
+
+def word_table_flowable(table, styles: dict, width: float):
+    """A docx table as a reportlab table of equal-width text columns.
+    Merged cells (which python-docx repeats at every grid position they
+    cover) are drawn once and spanned."""
+    from reportlab.platypus import Paragraph, Table, TableStyle
+    
+    rows = []
+    positions = {}  # cell element -> grid positions it covers
+    for row_index, row in enumerate(table.rows):
+        cells = []
+        for column_index, cell in enumerate(row.cells):
+            covered = positions.setdefault(cell._tc, [])
+            cells.append(Paragraph(word_markup(cell.text), styles["cell"]) if not covered else "")
+            covered.append((column_index, row_index))
+        rows.append(cells)
+    columns = max((len(row) for row in rows), default=0)
+    if not columns:
+        return None
+    for row in rows:
+        row.extend([""] * (columns - len(row)))
+    flowable = Table(rows, colWidths=[width / columns] * columns, style=styles["table"])
+    spans = [
+        ("SPAN", min(covered), max(covered))
+        for covered in positions.values() if len(covered) > 1
+    ]
+    if spans:
+        flowable.setStyle(TableStyle(spans))
+    return flowable
+
+def word_flowables(doc, width: float, job_id: Optional[str] = None) -> Iterator:
+    """Yield the flowables of a docx body in document order.
+    
+    Paragraphs and tables are wrapped and converted only when reached, and
+    each is detached from the parsed body once converted, so the XML tree
+    shrinks as the PDF pages accumulate.
+    """
+    from docx.oxml.ns import qn
+    from docx.table import Table as DocxTable
+    from docx.text.paragraph import Paragraph as DocxParagraph
+    from reportlab.platypus import Paragraph, Spacer
+    
+    styles = word_pdf_stylesheet()
+    style_cache = {}
+    body = doc.element.body
+    total = len(body) - 1  # every child but the section properties
+    produced = False
+    index = 0
+    element = body[0] if len(body) else None
+    while element is not None:
+        following = element.getnext()
+        if element.tag in (qn("w:p"), qn("w:tbl")):
+            check_cancelled()
+            if index % WORD_LAYOUT_CHUNK == 0:
+                report_progress(job_id, "layout", index, total)
+            index += 1
+            if element.tag == qn("w:tbl"):
+                table = word_table_flowable(DocxTable(element, doc), styles, width)
+                if table is not None:
+                    produced = True
+                    yield table
+                    yield Spacer(1, 12)
+            else:
+                paragraph = DocxParagraph(element, doc)
+                text = paragraph.text
+                if text.strip():
+                    produced = True
+                    style = word_paragraph_style(paragraph, styles, style_cache)
+                    yield Paragraph(word_markup(text), style)
+                    if style is styles["Normal"]:
+                        yield Spacer(1, 12)
+            body.remove(element)
+        element = following
+    report_progress(job_id, "layout", total, total)
+    if not produced:
+        yield Paragraph("No content found in document", styles["Normal"])
+
+class FlowableFeed(list):
+    """A flowable list for reportlab's build loop that refills itself from
+    an iterator, keeping between WORD_LAYOUT_CHUNK and twice that many
+    flowables queued (enough lookahead for keep-with-next headings)"""
+    
+    def __init__(self, source: Iterator):
+        super().__init__()
+        self.source = source
+    
+    def __len__(self):
+        if self.source is not None and super().__len__() < WORD_LAYOUT_CHUNK:
+            before = super().__len__()
+            self.extend(itertools.islice(self.source, 2 * WORD_LAYOUT_CHUNK - before))
+            if super().__len__() < 2 * WORD_LAYOUT_CHUNK:
+                self.source = None  # exhausted
+        return super().__len__()
+
+def word_to_pdf_converter(word_path: str, output_path: str, job_id: Optional[str] = None) -> bool:
+    """Convert Word document to PDF.
+    
+    The body is laid out in one pass over paragraphs, headings and tables,
+    with flowables created a chunk at a time as reportlab consumes them.
+    """
     if not DOCX_AVAILABLE or not REPORTLAB_AVAILABLE:
         return False
     
     try:
+        from docx import Document
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate
+        
         # Read Word document
         doc = Document(word_path)
         
         # Create PDF using reportlab
         pdf_doc = SimpleDocTemplate(output_path, pagesize=letter)
-        styles = getSampleStyleSheet()
-        content = []
         
-        # Extract text from Word document
-        for paragraph in doc.paragraphs:
-            if paragraph.text.strip():
-                p = Paragraph(paragraph.text, styles['Normal'])
-                content.append(p)
-                content.append(Spacer(1, 12))
-        
-        if not content:
-            content.append(Paragraph("No content found in document", styles['Normal']))
-        
-        pdf_doc.build(content)
+        started = time.perf_counter()
+        # Check for cancellation as each page is laid out
+        pdf_doc.build(
+            FlowableFeed(word_flowables(doc, pdf_doc.width, job_id)),
+            onFirstPage=stop_if_cancelled, onLaterPages=stop_if_cancelled
+        )
+        record_stage("build_pdf", time.perf_counter() - started)
         return True
         
     except Exception as e:
         print(f"Word to PDF conversion error: {e}")
         return False
 
-async def merge_pdfs(pdf_paths: List[str], output_path: str) -> bool:
-    """Merge multiple PDFs into one"""
+def merge_pdfs(pdf_paths: List[str], output_path: str, job_id: Optional[str] = None, page_ranges: Optional[List[Optional[str]]] = None) -> bool:
+    """Merge multiple PDFs into one, streaming objects straight to disk.
+    
+    Inputs are read one at a time and every object is written out as soon
+    as it is reached, so memory depends on the largest input rather than on
+    the output. Objects that come out byte-for-byte identical after
+    renumbering (fonts, images, resource dictionaries shared by documents
+    from the same generator) are written once and shared. `page_ranges`
+    optionally gives a page selection per input, None for all pages.
+    Outlines, forms and named destinations of the inputs are not carried over.
+    """
     if not PYPDF2_AVAILABLE:
         return False
+    import PyPDF2
+    from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NullObject, StreamObject
+    
+    page_ranges = page_ranges or [None] * len(pdf_paths)
+    offsets = {}  # output object number -> byte offset
+    shared = {}  # SHA-256 of a serialized object -> output object number
+    kids = []  # output page objects in order
+    next_number = 3  # 1 is the catalog, 2 the page tree
     
     try:
-        pdf_merger = PyPDF2.PdfMerger()
-        
-        for pdf_path in pdf_paths:
-            with open(pdf_path, 'rb') as pdf_file:
-                pdf_merger.append(pdf_file)
-        
-        with open(output_path, 'wb') as output_file:
-            pdf_merger.write(output_file)
+        started = time.perf_counter()
+        with open(output_path, 'wb') as out:
+            out.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+            
+            def allocate() -> int:
+                nonlocal next_number
+                next_number += 1
+                return next_number - 1
+            
+            def serialize(value) -> bytes:
+                buffer = io.BytesIO()
+                value.write_to_stream(buffer, None)
+                return buffer.getvalue()
+            
+            def write_object(number: int, data: bytes):
+                offsets[number] = out.tell()
+                out.write(b"%d 0 obj\n" % number)
+                out.write(data)
+                out.write(b"\nendobj\n")
+            
+            numbers = {}  # (idnum, generation) in the current input -> output number, None if dropped
+            copying = set()  # objects of the current input whose copy is in progress
+            
+            def copy(value):
+                """The output form of a value of the current input"""
+                if isinstance(value, IndirectObject):
+                    return copy_indirect(value)
+                if isinstance(value, DictionaryObject):
+                    result = DictionaryObject()
+                    for key, item in value.items():
+                        result[NameObject(key)] = copy(item)
+                    return result
+                if isinstance(value, ArrayObject):
+                    return ArrayObject(copy(item) for item in value)
+                return value
+            
+            def copy_indirect(ref: IndirectObject):
+                key = (ref.idnum, ref.generation)
+                if key in numbers:
+                    number = numbers[key]
+                    return NullObject() if number is None else IndirectObject(number, 0, None)
+                if key in copying:
+                    # A reference cycle: number the object now; it is
+                    # written unshared once its copy completes
+                    numbers[key] = allocate()
+                    return IndirectObject(numbers[key], 0, None)
+                target = ref.get_object()
+                if target is None or (isinstance(target, DictionaryObject)
+                                      and target.get("/Type") in ("/Page", "/Pages")):
+                    # Pages that are not part of the output (e.g. link targets)
+                    numbers[key] = None
+                    return NullObject()
+                copying.add(key)
+                try:
+                    if isinstance(target, StreamObject):
+                        result = StreamObject()
+                        for name, item in target.items():
+                            if name != "/Length":  # recomputed when written
+                                result[NameObject(name)] = copy(item)
+                        result._data = target._data
+                    else:
+                        result = copy(target)
+                finally:
+                    copying.discard(key)
+                data = serialize(result)
+                number = numbers.get(key)
+                if number is None:
+                    # Annotations belong to a single page, so they are never shared
+                    shareable = not (isinstance(target, DictionaryObject)
+                                     and ("/Rect" in target or target.get("/Type") == "/Annot"))
+                    digest = hashlib.sha256(data).digest() if shareable else None
+                    if digest in shared:
+                        numbers[key] = shared[digest]
+                        return IndirectObject(shared[digest], 0, None)
+                    number = numbers[key] = allocate()
+                    if shareable:
+                        shared[digest] = number
+                write_object(number, data)
+                return IndirectObject(number, 0, None)
+            
+            for index, (pdf_path, spec) in enumerate(zip(pdf_paths, page_ranges)):
+                check_cancelled()
+                numbers.clear()
+                copying.clear()
+                with open(pdf_path, 'rb') as pdf_file:
+                    reader = PyPDF2.PdfReader(pdf_file)
+                    if reader.is_encrypted:
+                        reader.decrypt("")
+                    selected = [
+                        reader.pages[page_num - 1]
+                        for first, last in resolve_page_ranges(spec, len(reader.pages))
+                        for page_num in range(first, last + 1)
+                    ]
+                    # Number the selected pages first so links and annotations
+                    # can point at them before they are written
+                    page_numbers = []
+                    for page in selected:
+                        number = allocate()
+                        ref = page.indirect_reference
+                        if ref is not None:
+                            numbers[(ref.idnum, ref.generation)] = number
+                        page_numbers.append(number)
+                    for page, number in zip(selected, page_numbers):
+                        check_cancelled()
+                        result = DictionaryObject()
+                        for name, item in page.items():
+                            if name not in ("/Parent", "/B"):  # page tree and article beads
+                                result[NameObject(name)] = copy(item)
+                        result[NameObject("/Parent")] = IndirectObject(2, 0, None)
+                        write_object(number, serialize(result))
+                        kids.append(number)
+                report_progress(job_id, "merge", index + 1, len(pdf_paths))
+            
+            if not kids:
+                print("PDF merge error: no pages selected")
+                return False
+            report_progress(job_id, "write", len(pdf_paths), len(pdf_paths))
+            write_object(2, b"<< /Type /Pages /Count %d /Kids [%s] >>" % (
+                len(kids), b" ".join(b"%d 0 R" % number for number in kids)))
+            write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+            xref_offset = out.tell()
+            out.write(b"xref\n0 %d\n0000000000 65535 f \n" % next_number)
+            for number in range(1, next_number):
+                out.write(b"%010d 00000 n \n" % offsets[number])
+            out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (next_number, xref_offset))
         
-        pdf_merger.close()
+        record_stage("merge", time.perf_counter() - started)
+        print(f"Merged {len(kids)} pages from {len(pdf_paths)} files, {len(shared)} distinct shared objects")
         return True
         
     except Exception as e:
@@ -458,14 +2168,1060 @@ async def merge_pdfs(pdf_paths: List[str], output_path: str) -> bool:
         return False
 
 # File I/O helper functions
-async def write_file(file_path: str, content: bytes):
-    """Write file with fallback"""
-    if AIOFILES_AVAILABLE:
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(content)
+async def save_upload(file: UploadFile, dest_path: str) -> dict:
+    """Stream an upload to disk in chunks with bounded memory.
+    
+    The data is hashed while it is written, and the upload is rejected with
+    413 as soon as MAX_FILE_SIZE is passed, whether or not the client sent
+    a size up front. Returns the size in bytes and the SHA-256 hex digest.
+    """
+    started = time.perf_counter()
+    digest = hashlib.sha256()
+    size = 0
+    
+    async def chunks():
+        nonlocal size
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"File too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB"
+                )
+            digest.update(chunk)
+            yield chunk
+    
+    try:
+        if AIOFILES_AVAILABLE:
+            async with aiofiles.open(dest_path, 'wb') as f:
+                async for chunk in chunks():
+                    await f.write(chunk)
+        else:
+            with open(dest_path, 'wb') as f:
+                async for chunk in chunks():
+                    f.write(chunk)
+    except BaseException:
+        # Never leave a partial upload behind
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    
+    # Until the request or job that saved it removes it
+    register_artifact(dest_path, size=size, in_use=True)
+    record_stage("ingest", time.perf_counter() - started)
+    inc_counter("upload_bytes_total", size)
+    return {"size": size, "sha256": digest.hexdigest()}
+
+async def save_uploads(files: List[UploadFile], max_total_size: Optional[int] = None) -> tuple:
+    """Save several uploads concurrently, INGEST_CONCURRENCY at a time.
+    
+    Returns (paths, sha256 hashes) in upload order. Fails with 413 once the
+    uploads add up to more than `max_total_size`; on any failure every file
+    saved so far is removed.
+    """
+    paths = [os.path.join(UPLOAD_DIR, generate_unique_filename(file.filename)) for file in files]
+    hashes = [None] * len(files)
+    slots = asyncio.Semaphore(INGEST_CONCURRENCY)
+    total_size = 0
+    
+    async def save(index: int):
+        nonlocal total_size
+        async with slots:
+            upload = await save_upload(files[index], paths[index])
+        total_size += upload["size"]
+        if max_total_size is not None and total_size > max_total_size:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Files too large. Maximum total size is {max_total_size // (1024*1024)}MB"
+            )
+        hashes[index] = upload["sha256"]
+    
+    tasks = [asyncio.create_task(save(index)) for index in range(len(files))]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        remove_files(paths)
+        raise
+    return paths, hashes
+
+# Artifact store
+def link_or_copy(src: str, dst: str):
+    """Hard-link src to dst, falling back to a copy across filesystems"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+def file_sha256(path: str) -> str:
+    """Hex SHA-256 of a file, used as the artifact's ETag"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class LocalArtifactBackend:
+    """Artifact blobs as files in one directory.
+    
+    On a mount shared by every host it serves the whole cluster; it also
+    stands in for an object store in development. Other backends provide
+    the same methods; `local_path` returns None when blobs are not files.
+    """
+    
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+    
+    def local_path(self, name: str) -> Optional[str]:
+        """A local file holding the blob, served directly by /download"""
+        return os.path.join(self.root, name)
+    
+    def put(self, name: str, source_path: str):
+        """Store a copy of a local file as `name`, replacing it atomically"""
+        partial = os.path.join(self.root, f"{name}.{uuid.uuid4().hex}.partial")
+        link_or_copy(source_path, partial)
+        os.replace(partial, os.path.join(self.root, name))
+    
+    def copy(self, name: str, new_name: str):
+        self.put(new_name, os.path.join(self.root, name))
+    
+    def fetch(self, name: str, dest_path: str):
+        """Copy a blob to a local file"""
+        link_or_copy(os.path.join(self.root, name), dest_path)
+    
+    def open(self, name: str):
+        """A binary file object for reading the blob; FileNotFoundError if missing"""
+        return open(os.path.join(self.root, name), 'rb')
+    
+    def exists(self, name: str) -> bool:
+        return os.path.isfile(os.path.join(self.root, name))
+    
+    def delete(self, name: str):
+        try:
+            os.remove(os.path.join(self.root, name))
+        except FileNotFoundError:
+            pass
+
+def get_artifact_backend():
+    """The ARTIFACT_BACKEND storage backend, opened on first use"""
+    global artifact_backend
+    if artifact_backend is None:
+        if ARTIFACT_BACKEND == "local":
+            artifact_backend = LocalArtifactBackend(ARTIFACT_DIR)
+        else:
+            module_name, _, factory = ARTIFACT_BACKEND.partition(":")
+            artifact_backend = getattr(importlib.import_module(module_name), factory)()
+    return artifact_backend
+
+def artifact_connection() -> sqlite3.Connection:
+    """Per-thread connection to the shared artifact index"""
+    conn = getattr(artifact_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(ARTIFACT_INDEX_PATH, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS artifacts (
+                name TEXT PRIMARY KEY,
+                owner TEXT,
+                converter TEXT,
+                size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                content_type TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS artifacts_expiry ON artifacts (expires_at)")
+        artifact_local.conn = conn
+    return conn
+
+def artifact_content_type(name: str) -> str:
+    return (
+        DOWNLOAD_MEDIA_TYPES.get(os.path.splitext(name)[1].lower())
+        or mimetypes.guess_type(name)[0]
+        or "application/octet-stream"
+    )
+
+def index_artifact(name: str, size: int, sha256: str, converter: Optional[str] = None, owner: Optional[str] = None) -> dict:
+    """Record a stored blob in the artifact index; it expires after ARTIFACT_TTL"""
+    now = time.time()
+    record = {
+        "name": name,
+        "owner": owner,
+        "converter": converter,
+        "size": size,
+        "sha256": sha256,
+        "content_type": artifact_content_type(name),
+        "created_at": now,
+        "expires_at": now + ARTIFACT_TTL,
+    }
+    artifact_connection().execute(
+        "INSERT OR REPLACE INTO artifacts VALUES (:name, :owner, :converter, :size, :sha256, :content_type, :created_at, :expires_at)",
+        record
+    )
+    return record
+
+def publish_artifact(source_path: str, name: str, converter: Optional[str] = None, owner: Optional[str] = None, sha256: Optional[str] = None) -> dict:
+    """Copy a finished output from UPLOAD_DIR into the store and index it.
+    The scratch file is left for the caller to remove."""
+    size = os.path.getsize(source_path)
+    sha256 = sha256 or file_sha256(source_path)
+    get_artifact_backend().put(name, source_path)
+    return index_artifact(name, size, sha256, converter, owner)
+
+def get_artifact(name: str) -> Optional[dict]:
+    """The index record of an artifact that has not expired"""
+    cursor = artifact_connection().cursor()
+    cursor.row_factory = sqlite3.Row
+    row = cursor.execute(
+        "SELECT * FROM artifacts WHERE name = ? AND expires_at > ?", (name, time.time())
+    ).fetchone()
+    return dict(row) if row is not None else None
+
+def pop_expired_artifacts(now: float) -> List[str]:
+    """Unindex up to JANITOR_BATCH artifacts that are expired or, while the
+    store is over ARTIFACT_QUOTA_BYTES, the closest to expiring"""
+    conn = artifact_connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        names = [row[0] for row in conn.execute(
+            "SELECT name FROM artifacts WHERE expires_at <= ? ORDER BY expires_at LIMIT ?", (now, JANITOR_BATCH)
+        )]
+        if not names:
+            excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0] - ARTIFACT_QUOTA_BYTES
+            for name, size in conn.execute(
+                "SELECT name, size FROM artifacts ORDER BY expires_at LIMIT ?", (JANITOR_BATCH,)
+            ).fetchall():
+                if excess <= 0:
+                    break
+                names.append(name)
+                excess -= size
+        conn.executemany("DELETE FROM artifacts WHERE name = ?", [(name,) for name in names])
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return names
+
+def sweep_artifact_store() -> int:
+    """Delete expired artifacts, then the oldest until under the quota; any
+    worker may run this, the index hands each artifact to one sweeper"""
+    backend = get_artifact_backend()
+    removed = 0
+    while True:
+        names = pop_expired_artifacts(time.time())
+        if not names:
+            return removed
+        for name in names:
+            try:
+                backend.delete(name)
+            except Exception as e:
+                print(f"Artifact delete error: {e}")
+        removed += len(names)
+
+def artifact_summary() -> dict:
+    """Artifact store usage, for /health"""
+    try:
+        count, size = artifact_connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts"
+        ).fetchone()
+    except sqlite3.Error:
+        count, size = None, None
+    return {"backend": ARTIFACT_BACKEND, "artifacts": count, "bytes": size, "quota_bytes": ARTIFACT_QUOTA_BYTES}
+
+# Result cache
+def cache_connection() -> sqlite3.Connection:
+    """Per-thread connection to the cache index; use it as `with conn:` to
+    run a transaction"""
+    conn = getattr(cache_local, "conn", None)
+    if conn is not None:
+        return conn
+    conn = sqlite3.connect(CACHE_INDEX_PATH, timeout=10)
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            converter TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            meta TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL
+        )"""
+    )
+    cache_local.conn = conn
+    return conn
+
+def cache_key(converter: str, input_hashes: List[str], params: dict) -> str:
+    """Derive the cache key for a conversion from its inputs and parameters"""
+    material = json.dumps(
+        {"converter": converter, "inputs": input_hashes, "params": params},
+        sort_keys=True
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+def cache_get(key: str) -> Optional[tuple]:
+    """Return (blob name, size, meta) for a cache entry and mark it recently used"""
+    with cache_connection() as conn:
+        row = conn.execute("SELECT path, size, meta FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        blob, size, meta = row
+        if not get_artifact_backend().exists(blob):
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+    return blob, size, json.loads(meta)
+
+def cache_put(key: str, converter: str, blob: str, size: int, meta: dict):
+    """Index a blob already placed in the artifact store and evict entries over budget"""
+    now = time.time()
+    with cache_connection() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, converter, blob, size, json.dumps(meta), now, now)
+        )
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        while total > CACHE_MAX_BYTES:
+            oldest = conn.execute(
+                "SELECT key, path, size FROM entries ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if oldest is None:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (oldest[0],))
+            get_artifact_backend().delete(oldest[1])
+            total -= oldest[2]
+            cache_stats["evictions"] += 1
+
+def cache_lookup(key: str, converter: str, owner: Optional[str] = None, publish: bool = True) -> Optional[dict]:
+    """Replay a cached output and return its response payload.
+    
+    The output becomes a new artifact in the store, or with `publish` False
+    a file in UPLOAD_DIR (for batch items, which are archived locally).
+    """
+    entry = cache_get(key)
+    if entry is None:
+        return None
+    blob, size, result = entry
+    sha256 = result.pop("sha256")
+    
+    output_filename = generate_unique_filename(blob)
+    backend = get_artifact_backend()
+    if publish:
+        backend.copy(blob, output_filename)
+        index_artifact(output_filename, size, sha256, converter, owner)
     else:
-        with open(file_path, 'wb') as f:
-            f.write(content)
+        backend.fetch(blob, os.path.join(UPLOAD_DIR, output_filename))
+    result["download_url"] = f"/download/{output_filename}"
+    result["filename"] = output_filename
+    return result
+
+def cache_store(key: str, converter: str, result: dict, output_path: str, sha256: str):
+    """Store a conversion output in the cache"""
+    _, ext = os.path.splitext(result["filename"])
+    blob = f"cache-{key}{ext}"
+    get_artifact_backend().put(blob, output_path)
+    meta = {k: v for k, v in result.items() if k not in ("download_url", "filename")}
+    meta["sha256"] = sha256
+    cache_put(key, converter, blob, os.path.getsize(output_path), meta)
+
+def load_cached_text(pdf_hash: str) -> Optional[List[str]]:
+    """Return the cached per-page text of a PDF, if it has been extracted before"""
+    entry = cache_get(cache_key("pdf-text", [pdf_hash], {}))
+    if entry is None:
+        return None
+    with get_artifact_backend().open(entry[0]) as f:
+        return json.load(f)
+
+def store_cached_text(pdf_hash: str, page_texts: List[str]):
+    """Cache the per-page text of a PDF by its content hash"""
+    key = cache_key("pdf-text", [pdf_hash], {})
+    tmp_path = os.path.join(UPLOAD_DIR, f"{key}.{uuid.uuid4().hex}.json")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(page_texts, f)
+        get_artifact_backend().put(f"cache-{key}.json", tmp_path)
+        cache_put(key, "pdf-text", f"cache-{key}.json", os.path.getsize(tmp_path), {"pages": len(page_texts)})
+    finally:
+        os.remove(tmp_path)
+
+def cache_summary() -> dict:
+    """Cache counters and current usage, for /health"""
+    try:
+        with cache_connection() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+    except sqlite3.Error:
+        entries, size = None, None
+    return {
+        **cache_stats,
+        "entries": entries,
+        "bytes": size,
+        "max_bytes": CACHE_MAX_BYTES,
+    }
+
+# Conversion pipelines shared by the /convert routes and background jobs
+def record_pages(converter: str, pages: int, seconds: float):
+    """Count pages processed by a conversion and record its throughput"""
+    inc_counter("conversion_pages_total", pages, converter=converter)
+    if seconds > 0:
+        observe("conversion_pages_per_second", pages / seconds, converter=converter)
+
+def remove_files(paths: List[str]):
+    """Remove files that may or may not exist"""
+    for path in paths:
+        if path:
+            forget_artifact(path)
+            if os.path.exists(path):
+                os.remove(path)
+
+async def get_pdf_text(pdf_path: str, total_pages: int, pdf_hash: Optional[str] = None, job_id: Optional[str] = None) -> List[str]:
+    """Return the text of every page of a PDF, extracted in parallel chunks.
+    
+    Chunks of PDF_TEXT_CHUNK_PAGES pages are extracted on the conversion pool
+    and reassembled in page order. Results are cached by document hash, so
+    repeat conversions and other text-based features can reuse them.
+    """
+    if pdf_hash is not None and CACHE_MAX_BYTES > 0:
+        try:
+            page_texts = await asyncio.to_thread(load_cached_text, pdf_hash)
+        except Exception as e:
+            print(f"Text cache lookup failed: {e}")
+            page_texts = None
+        if page_texts is not None:
+            return page_texts
+    
+    # Workers count extracted pages towards the job as they go
+    if job_id is not None:
+        apply_progress(job_id, "extract", 0, total_pages)
+    chunks = await asyncio.gather(*[
+        run_conversion(
+            "pdf-to-word", extract_text_chunk, pdf_path,
+            start, min(start + PDF_TEXT_CHUNK_PAGES, total_pages), job_id, total_pages
+        )
+        for start in range(0, total_pages, PDF_TEXT_CHUNK_PAGES)
+    ])
+    page_texts = [text for chunk in chunks for text in chunk]
+    
+    if pdf_hash is not None and CACHE_MAX_BYTES > 0:
+        try:
+            await asyncio.to_thread(store_cached_text, pdf_hash, page_texts)
+        except Exception as e:
+            print(f"Text cache store failed: {e}")
+    return page_texts
+
+async def process_pdf_to_word(input_path: str, original_filename: str, input_hash: Optional[str] = None, job_id: Optional[str] = None) -> dict:
+    """Convert a saved PDF upload to Word and return the response payload"""
+    try:
+        output_filename = generate_unique_filename(original_filename, '.docx')
+        output_path = os.path.join(UPLOAD_DIR, output_filename)
+        track_outputs(output_path)
+        
+        probe = await run_conversion("pdf-to-word", probe_pdf, input_path)
+        validate_pdf_probe(probe)
+        
+        async with admission(*estimate_conversion_cost("pdf-to-word", probe["file_size"], probe)):
+            started = time.perf_counter()
+            try:
+                page_texts = await get_pdf_text(input_path, probe["page_count"], input_hash, job_id)
+            except HTTPException:
+                raise
+            except Exception as e:
+                print(f"PDF text extraction error: {e}")
+                raise HTTPException(status_code=500, detail="Conversion failed")
+            
+            success = await run_conversion(
+                "pdf-to-word", build_word_document, page_texts, output_path, job_id, job_id=job_id
+            )
+        if not success:
+            raise HTTPException(status_code=500, detail="Conversion failed")
+        record_pages("pdf-to-word", probe["page_count"], time.perf_counter() - started)
+    finally:
+        remove_files([input_path])
+    
+    return {
+        "message": "PDF converted to Word successfully",
+        "download_url": f"/download/{output_filename}",
+        "filename": output_filename,
+        "page_count": probe["page_count"]
+    }
+
+async def process_word_to_pdf(input_path: str, original_filename: str, job_id: Optional[str] = None) -> dict:
+    """Convert a saved Word upload to PDF and return the response payload"""
+    try:
+        output_filename = generate_unique_filename(original_filename, '.pdf')
+        output_path = os.path.join(UPLOAD_DIR, output_filename)
+        track_outputs(output_path)
+        
+        cost = estimate_conversion_cost("word-to-pdf", os.path.getsize(input_path))
+        async with admission(*cost):
+            success = await run_conversion(
+                "word-to-pdf", word_to_pdf_converter, input_path, output_path, job_id, job_id=job_id
+            )
+        if not success:
+            raise HTTPException(status_code=500, detail="Conversion failed")
+    finally:
+        remove_files([input_path])
+    
+    return {
+        "message": "Word document converted to PDF successfully",
+        "download_url": f"/download/{output_filename}",
+        "filename": output_filename
+    }
+
+async def process_merge_pdf(input_paths: List[str], page_ranges: Optional[List[Optional[str]]] = None, job_id: Optional[str] = None) -> dict:
+    """Merge saved PDF uploads and return the response payload"""
+    try:
+        output_filename = generate_unique_filename("merged_document.pdf", '.pdf')
+        output_path = os.path.join(UPLOAD_DIR, output_filename)
+        track_outputs(output_path)
+        
+        # Inputs are streamed one at a time, so the largest one sets the peak
+        cost = estimate_conversion_cost("merge-pdf", max(os.path.getsize(path) for path in input_paths))
+        async with admission(*cost):
+            success = await run_conversion(
+                "merge-pdf", merge_pdfs, input_paths, output_path, job_id, page_ranges, job_id=job_id
+            )
+        if not success:
+            raise HTTPException(status_code=500, detail="PDF merge failed")
+    finally:
+        remove_files(input_paths)
+    
+    return {
+        "message": f"{len(input_paths)} PDF files merged successfully",
+        "download_url": f"/download/{output_filename}",
+        "filename": output_filename
+    }
+
+async def process_pdf_to_images(input_path: str, options: Optional[dict] = None, job_id: Optional[str] = None) -> dict:
+    """Render a saved PDF upload to a ZIP of page images and return the response payload"""
+    try:
+        probe = await run_conversion("pdf-to-images", probe_pdf, input_path)
+        validate_pdf_probe(probe, IMAGES_FAILED_DETAIL)
+        options = options or {}
+        if not resolve_page_ranges(options.get("pages"), probe["page_count"]):
+            raise HTTPException(
+                status_code=400,
+                detail=f"No requested pages in document ({probe['page_count']} pages)"
+            )
+        print(f"Estimated decoded size per page: {estimate_page_bytes(probe, resolve_render_dpi(probe, options)) // (1024*1024)}MB")
+        
+        zip_filename = f"pdf_images_{uuid.uuid4().hex[:8]}.zip"
+        zip_path = os.path.join(UPLOAD_DIR, zip_filename)
+        track_outputs(zip_path, render_scratch_dir(zip_path))
+        
+        # Convert PDF to images, streaming each page window into the ZIP
+        async with admission(*estimate_conversion_cost("pdf-to-images", probe["file_size"], probe, options)):
+            started = time.perf_counter()
+            image_count = await run_conversion(
+                "pdf-to-images", pdf_to_images_converter, input_path, zip_path, options, probe, job_id,
+                job_id=job_id
+            )
+        
+        if not image_count:
+            raise HTTPException(status_code=500, detail=IMAGES_FAILED_DETAIL)
+        record_pages("pdf-to-images", image_count, time.perf_counter() - started)
+        
+        print(f"Conversion completed successfully. ZIP file: {zip_filename}")
+        
+        return {
+            "message": f"PDF converted to {image_count} images successfully",
+            "download_url": f"/download/{zip_filename}",
+            "filename": zip_filename,
+            "image_count": image_count,
+            "page_count": probe["page_count"],
+            "format": options.get("format", "png")
+        }
+    finally:
+        remove_files([input_path])
+
+# Converter metadata used by the /jobs API
+JOB_CONVERTERS = {
+    "pdf-to-word": {"extensions": (".pdf",), "min_files": 1, "max_files": 1},
+    "word-to-pdf": {"extensions": (".docx", ".doc"), "min_files": 1, "max_files": 1},
+    "merge-pdf": {"extensions": (".pdf",), "min_files": 2, "max_files": MAX_MERGE_FILES},
+    "pdf-to-images": {"extensions": (".pdf",), "min_files": 1, "max_files": 1},
+}
+
+def ensure_converter_available(converter: str):
+    """Raise 503 if the dependencies for a converter are missing"""
+    if converter == "pdf-to-word" and (not PYPDF2_AVAILABLE or not DOCX_AVAILABLE):
+        raise HTTPException(
+            status_code=503, 
+            detail="PDF to Word conversion not available. Missing dependencies: PyPDF2 or python-docx"
+        )
+    if converter == "word-to-pdf" and (not DOCX_AVAILABLE or not REPORTLAB_AVAILABLE):
+        raise HTTPException(
+            status_code=503, 
+            detail="Word to PDF conversion not available. Missing dependencies: python-docx or reportlab"
+        )
+    if converter == "merge-pdf" and not PYPDF2_AVAILABLE:
+        raise HTTPException(
+            status_code=503, 
+            detail="PDF merge not available. Missing dependency: PyPDF2"
+        )
+    if converter == "pdf-to-images" and not PDF2IMAGE_AVAILABLE:
+        raise HTTPException(
+            status_code=503, 
+            detail="PDF to Images conversion not available. Missing dependencies: pdf2image or Pillow"
+        )
+
+def prune_jobs():
+    """Forget finished jobs older than JOB_RETENTION"""
+    cutoff = time.time() - JOB_RETENTION
+    for job_id in [
+        job_id for job_id, job in JOBS.items()
+        if job["state"] in ("completed", "failed") and job["finished_ts"] < cutoff
+    ]:
+        del JOBS[job_id]
+        notify_job(job_id)
+
+def job_snapshot(job: dict) -> dict:
+    """The public view of a job, as returned by /jobs/{id}"""
+    return {key: value for key, value in job.items() if key != "finished_ts"}
+
+async def job_event_stream(job_id: str):
+    """Yield a job's updates as server-sent events until it finishes.
+    
+    Every update wakes the stream, which sends the job as it is by then, so
+    updates that arrive faster than the client reads them are coalesced.
+    Running jobs are sent as "progress" events; the last event is named
+    after the final state ("completed" or "failed").
+    """
+    yield "retry: 3000\n\n"
+    last = None
+    while True:
+        job = JOBS.get(job_id)
+        if job is None:
+            return
+        updated = job_watchers.setdefault(job_id, asyncio.Event())
+        snapshot = job_snapshot(job)
+        finished = job["state"] in ("completed", "failed")
+        if snapshot != last:
+            event = job["state"] if finished else "progress"
+            yield f"event: {event}\ndata: {json.dumps(snapshot)}\n\n"
+            last = snapshot
+        if finished:
+            return
+        try:
+            await asyncio.wait_for(updated.wait(), JOB_EVENTS_KEEPALIVE)
+        except asyncio.TimeoutError:
+            yield ": keepalive\n\n"
+
+def build_image_options(
+    parallelism: Optional[int] = None,
+    pages: Optional[str] = None,
+    dpi: Optional[int] = None,
+    grayscale: bool = False,
+    max_width: Optional[int] = None,
+    max_height: Optional[int] = None,
+    image_format: str = "png",
+    quality: Optional[int] = None,
+    profile: str = "balanced"
+) -> dict:
+    """Validate pdf-to-images request parameters into converter options.
+    
+    Defaults are filled in and the page selection is normalized, so equal
+    requests produce equal options (and share cache entries).
+    """
+    if parallelism is not None and parallelism < 1:
+        raise HTTPException(status_code=400, detail="parallelism must be at least 1")
+    if pages:
+        try:
+            pages = format_page_ranges(parse_page_ranges(pages))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="pages must look like 1-3,7,10-")
+    dpi = dpi or RENDER_DPI
+    if not MIN_RENDER_DPI <= dpi <= MAX_RENDER_DPI:
+        raise HTTPException(
+            status_code=400, detail=f"dpi must be between {MIN_RENDER_DPI} and {MAX_RENDER_DPI}"
+        )
+    for name, value in (("max_width", max_width), ("max_height", max_height)):
+        if value is not None and value < 1:
+            raise HTTPException(status_code=400, detail=f"{name} must be at least 1")
+    image_format = image_format.lower()
+    if image_format == "jpg":
+        image_format = "jpeg"
+    if image_format not in IMAGE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(IMAGE_FORMATS)}")
+    if profile not in IMAGE_PROFILES:
+        raise HTTPException(status_code=400, detail=f"profile must be one of: {', '.join(IMAGE_PROFILES)}")
+    if image_format == "png":
+        quality = None  # PNG is lossless
+    else:
+        if quality is None:
+            quality = DEFAULT_IMAGE_QUALITY[image_format]
+        if not 1 <= quality <= 100:
+            raise HTTPException(status_code=400, detail="quality must be between 1 and 100")
+    return {
+        "parallelism": parallelism,
+        "pages": pages or None,
+        "dpi": dpi,
+        "grayscale": grayscale,
+        "max_width": max_width,
+        "max_height": max_height,
+        "format": image_format,
+        "quality": quality,
+        "profile": profile,
+    }
+
+async def image_options_form(
+    parallelism: Optional[int] = Form(None),
+    pages: Optional[str] = Form(None),
+    dpi: Optional[int] = Form(None),
+    grayscale: bool = Form(False),
+    max_width: Optional[int] = Form(None),
+    max_height: Optional[int] = Form(None),
+    image_format: str = Form("png", alias="format"),
+    quality: Optional[int] = Form(None),
+    profile: str = Form("balanced")
+) -> dict:
+    """pdf-to-images options from the request form"""
+    return build_image_options(
+        parallelism, pages, dpi, grayscale, max_width, max_height, image_format, quality, profile
+    )
+
+def build_merge_options(page_ranges: Optional[str], file_count: int) -> dict:
+    """Validate the per-file page selections of a merge request.
+    
+    `page_ranges` is a JSON array with one entry per file: a selection such
+    as "1-3,7" or null/"" for every page.
+    """
+    if not page_ranges:
+        return {}
+    try:
+        specs = json.loads(page_ranges)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="page_ranges must be a JSON array")
+    if not isinstance(specs, list) or len(specs) != file_count:
+        raise HTTPException(status_code=400, detail=f"page_ranges must have one entry per file ({file_count})")
+    normalized = []
+    for spec in specs:
+        if spec is None or spec == "":
+            normalized.append(None)
+            continue
+        try:
+            normalized.append(format_page_ranges(parse_page_ranges(str(spec))))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="page ranges must look like 1-3,7,10-")
+    return {"page_ranges": normalized} if any(normalized) else {}
+
+def cache_params(converter: str, options: dict) -> dict:
+    """The options that change a converter's output (and so belong in the cache key)"""
+    if converter == "pdf-to-images":
+        # Neither changes the pages, only how fast they are produced
+        return {k: v for k, v in options.items() if k not in ("parallelism", "render_mode")}
+    if converter == "merge-pdf" and options.get("page_ranges"):
+        return {"page_ranges": options["page_ranges"]}
+    return {}
+
+async def run_pipeline(
+    converter: str,
+    input_paths: List[str],
+    input_hashes: List[str],
+    original_filename: str,
+    options: Optional[dict] = None,
+    job_id: Optional[str] = None,
+    request: Optional[Request] = None,
+    owner: Optional[str] = None,
+    publish: bool = True
+) -> dict:
+    """Run a conversion on saved uploads, serving it from the result cache when possible.
+    
+    The conversion is cancelled if `request`'s client disconnects or it runs
+    past CONVERSION_TIME_LIMITS[converter]; its outputs are then removed.
+    The output is published to the artifact store under `owner` (by default
+    the requesting client), or with `publish` False left in UPLOAD_DIR.
+    """
+    options = options or {}
+    key = None
+    if owner is None and request is not None:
+        owner = get_client_ip(request)
+    
+    if CACHE_MAX_BYTES > 0:
+        key = cache_key(converter, input_hashes, cache_params(converter, options))
+        try:
+            cached = await asyncio.to_thread(cache_lookup, key, converter, owner, publish)
+        except Exception as e:
+            print(f"Cache lookup failed: {e}")
+            cached = None
+        if cached is not None:
+            cache_stats["hits"] += 1
+            if not publish:
+                register_artifact(os.path.join(UPLOAD_DIR, cached["filename"]), in_use=True)
+            remove_files(input_paths)
+            cached["cached"] = True
+            return cached
+        cache_stats["misses"] += 1
+    
+    limit = CONVERSION_TIME_LIMITS[converter]
+    scope = {
+        "converter": converter,
+        "request": request,
+        "limit": limit,
+        "deadline": time.time() + limit,
+        "cancelled": None,
+        "outputs": [],
+    }
+    scope_token = conversion_scope.set(scope)
+    try:
+        if converter == "pdf-to-word":
+            result = await process_pdf_to_word(input_paths[0], original_filename, input_hashes[0], job_id)
+        elif converter == "word-to-pdf":
+            result = await process_word_to_pdf(input_paths[0], original_filename, job_id)
+        elif converter == "merge-pdf":
+            result = await process_merge_pdf(input_paths, options.get("page_ranges"), job_id)
+        else:
+            result = await process_pdf_to_images(input_paths[0], options, job_id)
+    except BaseException:
+        # Partial output of a failed, cancelled or killed conversion
+        delete_artifacts(scope["outputs"])
+        raise
+    finally:
+        conversion_scope.reset(scope_token)
+    
+    output_path = os.path.join(UPLOAD_DIR, result["filename"])
+    try:
+        output_size = path_size(output_path)
+    except OSError:
+        output_size = 0
+    register_artifact(output_path, size=output_size, in_use=True)
+    inc_counter("output_bytes_total", output_size, converter=converter)
+    
+    try:
+        sha256 = await asyncio.to_thread(file_sha256, output_path)
+        if key is not None:
+            try:
+                await asyncio.to_thread(cache_store, key, converter, result, output_path, sha256)
+            except Exception as e:
+                print(f"Cache store failed: {e}")
+        if publish:
+            await publish_output(output_path, result["filename"], converter, owner, sha256)
+    except BaseException:
+        remove_files([output_path])
+        raise
+    return result
+
+async def publish_output(output_path: str, name: str, converter: str, owner: Optional[str], sha256: Optional[str] = None):
+    """Publish a finished output from UPLOAD_DIR to the artifact store and drop the scratch copy"""
+    try:
+        await asyncio.to_thread(publish_artifact, output_path, name, converter, owner, sha256)
+    except Exception as e:
+        print(f"Publishing {name} failed: {e}")
+        raise HTTPException(status_code=500, detail="Could not store the conversion output")
+    finally:
+        remove_files([output_path])
+
+async def run_job(
+    job_id: str,
+    converter: str,
+    input_paths: List[str],
+    input_hashes: List[str],
+    original_filename: str,
+    options: Optional[dict] = None,
+    owner: Optional[str] = None
+):
+    """Run a submitted job to completion and record the outcome"""
+    # The job outlives its submission request: it must not leave that request's
+    # place in the admission queue, which the door gives back when it responds
+    admission_ticket.set(None)
+    job = JOBS[job_id]
+    try:
+        result = await run_pipeline(
+            converter, input_paths, input_hashes, original_filename, options, job_id, owner=owner
+        )
+        job["state"] = "completed"
+        job["result"] = result
+        job["download_url"] = result["download_url"]
+    except HTTPException as e:
+        job["state"] = "failed"
+        job["error"] = e.detail
+    except Exception as e:
+        print(f"Job {job_id} failed: {e}")
+        job["state"] = "failed"
+        job["error"] = f"Conversion error: {str(e)}"
+    finally:
+        remove_files(input_paths)
+        job["updated_at"] = datetime.now().isoformat()
+        job["finished_ts"] = time.time()
+        notify_job(job_id)
+
+async def convert_batch_item(index: int, converter: str, input_path: str, input_hash: str, original_filename: str, options: dict, request: Optional[Request] = None) -> dict:
+    """Run one file of a batch; failures become manifest entries instead of errors"""
+    entry = {"index": index, "filename": original_filename, "status": "failed"}
+    try:
+        result = await run_pipeline(
+            converter, [input_path], [input_hash], original_filename, options, request=request, publish=False
+        )
+    except HTTPException as e:
+        if e.status_code == CLIENT_CLOSED_REQUEST:
+            raise  # Nobody will download the archive: stop the whole batch
+        entry["error"] = e.detail
+        return entry
+    except Exception as e:
+        print(f"Batch item {original_filename} failed: {e}")
+        entry["error"] = f"Conversion error: {str(e)}"
+        return entry
+    finally:
+        remove_files([input_path])
+    entry.update({k: v for k, v in result.items() if k not in ("message", "download_url", "filename")})
+    entry["output"] = result["filename"]
+    entry["status"] = "ok"
+    return entry
+
+def batch_entry_name(index: int, original_filename: str, output_filename: str) -> str:
+    """Archive name for a batch output: numbered, after the uploaded file"""
+    stem = os.path.splitext(os.path.basename(original_filename))[0] or "file"
+    _, ext = os.path.splitext(output_filename)
+    suffix = "_images" if ext == ".zip" else ""
+    return f"{index + 1:03d}_{stem}{suffix}{ext}"
+
+async def process_batch(converter: str, uploads: List[dict], options: dict, zip_path: str, request: Optional[Request] = None) -> List[dict]:
+    """Convert saved uploads concurrently and add each output to the archive
+    as soon as it is ready; returns the manifest entries in upload order"""
+    tasks = [
+        asyncio.create_task(convert_batch_item(
+            index, converter, upload["path"], upload["sha256"], upload["filename"], options, request
+        ))
+        for index, upload in enumerate(uploads) if "error" not in upload
+    ]
+    manifest = [
+        {"index": index, "filename": upload["filename"], "status": "failed", "error": upload["error"]}
+        for index, upload in enumerate(uploads) if "error" in upload
+    ]
+    
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_STORED) as zipf:
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                entry = await next_done
+                if entry["status"] == "ok":
+                    output_path = os.path.join(UPLOAD_DIR, entry["output"])
+                    entry["output"] = batch_entry_name(entry["index"], entry["filename"], entry["output"])
+                    # Only PDFs still gain from deflating; DOCX and ZIP are compressed already
+                    compression = zipfile.ZIP_DEFLATED if output_path.endswith(".pdf") else zipfile.ZIP_STORED
+                    try:
+                        await asyncio.to_thread(zipf.write, output_path, entry["output"], compression)
+                    except OSError as e:
+                        print(f"Adding {output_path} to batch failed: {e}")
+                        entry = {**entry, "status": "failed", "error": "Conversion output missing"}
+                        entry.pop("output")
+                    finally:
+                        remove_files([output_path])
+                manifest.append(entry)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            # Outputs of items that finished but were not archived yet
+            for task in tasks:
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    entry = task.result()
+                    if entry["status"] == "ok":
+                        remove_files([os.path.join(UPLOAD_DIR, entry["output"])])
+            raise
+        
+        manifest.sort(key=lambda entry: entry["index"])
+        zipf.writestr("manifest.json", json.dumps({"converter": converter, "files": manifest}, indent=2))
+    return manifest
+
+# Downloads
+def etag_listed(header: str, etag: str, weak: bool = False) -> bool:
+    """Whether a list of entity tags (If-None-Match, If-Range) matches etag.
+    Weak comparison ignores W/ prefixes; strong comparison never matches them."""
+    for tag in (tag.strip() for tag in header.split(",")):
+        if tag == "*" or tag == etag or (weak and tag == f"W/{etag}"):
+            return True
+    return False
+
+def header_timestamp(value: str) -> Optional[float]:
+    """Parse an HTTP date header, or None if it is malformed"""
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """Evaluate If-None-Match, or failing that If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_listed(if_none_match, etag, weak=True)
+    since = header_timestamp(request.headers.get("if-modified-since", ""))
+    return since is not None and int(mtime) <= since
+
+def parse_byte_range(request: Request, size: int, etag: str, mtime: float) -> Optional[tuple]:
+    """The (start, end) byte range to serve, inclusive, or None for the whole file.
+    
+    Only single ranges are served; several ranges, other units, malformed
+    headers and stale If-Range validators get the full file. A range that
+    starts past the end is answered with 416.
+    """
+    header = request.headers.get("range")
+    if not header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range is not None:
+        if if_range.startswith(('"', 'W/')):
+            if not etag_listed(if_range, etag):
+                return None
+        elif header_timestamp(if_range) != int(mtime):
+            return None
+    unit, _, spec = header.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    if unit.strip().lower() != "bytes" or "," in spec or not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if last and end < start:
+                return None
+            end = min(end, size - 1)
+        else:
+            suffix = int(last)  # the last `suffix` bytes
+            if suffix < 0:
+                return None
+            start, end = max(0, size - suffix), size - 1
+    except ValueError:
+        return None
+    if start >= size or (not first and suffix == 0):
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+def download_headers(record: dict) -> dict:
+    """Validator and cache headers for an artifact; it may be cached until it expires"""
+    return {
+        "ETag": f'"{record["sha256"]}"',
+        "Last-Modified": formatdate(record["created_at"], usegmt=True),
+        "Cache-Control": f"private, max-age={max(0, int(record['expires_at'] - time.time()))}",
+        "Expires": formatdate(record["expires_at"], usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{record["name"]}"',
+    }
+
+async def artifact_chunks(name: str, start: int, end: int):
+    """Yield bytes start..end (inclusive) of an artifact in DOWNLOAD_CHUNK_SIZE chunks"""
+    remaining = end - start + 1
+    f = await asyncio.to_thread(get_artifact_backend().open, name)
+    try:
+        if start:
+            await asyncio.to_thread(f.seek, start)
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(DOWNLOAD_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
 
 # API Routes
 @app.get("/")
@@ -483,25 +3239,28 @@ async def health_check():
             "PyPDF2": PYPDF2_AVAILABLE,
             "reportlab": REPORTLAB_AVAILABLE,
             "python-docx": DOCX_AVAILABLE,
-            "pdf2image": PDF2IMAGE_AVAILABLE and (POPPLER_PATH is not None)
-        }
+            "pdf2image": PDF2IMAGE_AVAILABLE and poppler_available()
+        },
+        "converters": {converter: converter_status(converter) for converter in CONVERTER_DEPENDENCIES},
+        "poppler": {"path": get_poppler_path(), "available": poppler_available()},
+        "cache": cache_summary(),
+        "artifacts": artifact_summary()
     }
 
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.post("/convert/pdf-to-word")
 async def convert_pdf_to_word(
+    request: Request,
     file: UploadFile = File(...),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ):
-    if not PYPDF2_AVAILABLE or not DOCX_AVAILABLE:
-        raise HTTPException(
-            status_code=503, 
-            detail="PDF to Word conversion not available. Missing dependencies: PyPDF2 or python-docx"
-        )
+    ensure_converter_available("pdf-to-word")
     
     # Rate limiting
-    client_ip = "127.0.0.1"
-    check_rate_limit(client_ip)
-    cleanup_old_files()
+    await check_rate_limit(request, "pdf-to-word")
     
     # Validate file
     if not file.filename.lower().endswith('.pdf'):
@@ -514,48 +3273,24 @@ async def convert_pdf_to_word(
         input_filename = generate_unique_filename(file.filename)
         input_path = os.path.join(UPLOAD_DIR, input_filename)
         
-        content = await file.read()
-        await write_file(input_path, content)
+        upload = await save_upload(file, input_path)
         
-        # Generate output filename
-        output_filename = generate_unique_filename(file.filename, '.docx')
-        output_path = os.path.join(UPLOAD_DIR, output_filename)
-        
-        # Convert PDF to Word
-        success = await pdf_to_word_converter(input_path, output_path)
-        
-        if not success:
-            if os.path.exists(input_path):
-                os.remove(input_path)
-            raise HTTPException(status_code=500, detail="Conversion failed")
-        
-        # Cleanup input file
-        if os.path.exists(input_path):
-            os.remove(input_path)
-        
-        return {
-            "message": "PDF converted to Word successfully",
-            "download_url": f"/download/{output_filename}",
-            "filename": output_filename
-        }
+        return await run_pipeline("pdf-to-word", [input_path], [upload["sha256"]], file.filename, request=request)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Conversion error: {str(e)}")
 
 @app.post("/convert/word-to-pdf")
 async def convert_word_to_pdf(
+    request: Request,
     file: UploadFile = File(...),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ):
-    if not DOCX_AVAILABLE or not REPORTLAB_AVAILABLE:
-        raise HTTPException(
-            status_code=503, 
-            detail="Word to PDF conversion not available. Missing dependencies: python-docx or reportlab"
-        )
+    ensure_converter_available("word-to-pdf")
     
-    client_ip = "127.0.0.1"
-    check_rate_limit(client_ip)
-    cleanup_old_files()
+    await check_rate_limit(request, "word-to-pdf")
     
     # Validate file
     if not (file.filename.lower().endswith('.docx') or file.filename.lower().endswith('.doc')):
@@ -568,115 +3303,64 @@ async def convert_word_to_pdf(
         input_filename = generate_unique_filename(file.filename)
         input_path = os.path.join(UPLOAD_DIR, input_filename)
         
-        content = await file.read()
-        await write_file(input_path, content)
-        
-        # Generate output filename
-        output_filename = generate_unique_filename(file.filename, '.pdf')
-        output_path = os.path.join(UPLOAD_DIR, output_filename)
-        
-        # Convert Word to PDF
-        success = await word_to_pdf_converter(input_path, output_path)
-        
-        if not success:
-            if os.path.exists(input_path):
-                os.remove(input_path)
-            raise HTTPException(status_code=500, detail="Conversion failed")
-        
-        # Cleanup input file
-        if os.path.exists(input_path):
-            os.remove(input_path)
+        upload = await save_upload(file, input_path)
         
-        return {
-            "message": "Word document converted to PDF successfully",
-            "download_url": f"/download/{output_filename}",
-            "filename": output_filename
-        }
+        return await run_pipeline("word-to-pdf", [input_path], [upload["sha256"]], file.filename, request=request)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Conversion error: {str(e)}")
 
 @app.post("/convert/merge-pdf")
 async def merge_pdf_files(
+    request: Request,
     files: List[UploadFile] = File(...),
+    page_ranges: Optional[str] = Form(None),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ):
-    if not PYPDF2_AVAILABLE:
-        raise HTTPException(
-            status_code=503, 
-            detail="PDF merge not available. Missing dependency: PyPDF2"
-        )
+    ensure_converter_available("merge-pdf")
     
-    client_ip = "127.0.0.1"
-    check_rate_limit(client_ip)
-    cleanup_old_files()
+    await check_rate_limit(request, "merge-pdf")
     
     if len(files) < 2:
         raise HTTPException(status_code=400, detail="At least 2 PDF files are required for merging")
     
-    if len(files) > 10:
-        raise HTTPException(status_code=400, detail="Maximum 10 files allowed for merging")
+    if len(files) > MAX_MERGE_FILES:
+        raise HTTPException(status_code=400, detail=f"Maximum {MAX_MERGE_FILES} files allowed for merging")
+    
+    options = build_merge_options(page_ranges, len(files))
+    for file in files:
+        if not file.filename.lower().endswith('.pdf'):
+            raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+        validate_file_size(file)
     
     input_paths = []
     
     try:
-        # Save all uploaded files
-        for file in files:
-            if not file.filename.lower().endswith('.pdf'):
-                raise HTTPException(status_code=400, detail="Only PDF files are allowed")
-            
-            validate_file_size(file)
-            
-            input_filename = generate_unique_filename(file.filename)
-            input_path = os.path.join(UPLOAD_DIR, input_filename)
-            input_paths.append(input_path)
-            
-            content = await file.read()
-            await write_file(input_path, content)
+        input_paths, input_hashes = await save_uploads(files, MAX_MERGE_TOTAL_SIZE)
         
-        # Generate output filename
-        output_filename = generate_unique_filename("merged_document.pdf", '.pdf')
-        output_path = os.path.join(UPLOAD_DIR, output_filename)
-        
-        # Merge PDFs
-        success = await merge_pdfs(input_paths, output_path)
-        
-        if not success:
-            raise HTTPException(status_code=500, detail="PDF merge failed")
-        
-        # Cleanup input files
-        for input_path in input_paths:
-            if os.path.exists(input_path):
-                os.remove(input_path)
-        
-        return {
-            "message": f"{len(files)} PDF files merged successfully",
-            "download_url": f"/download/{output_filename}",
-            "filename": output_filename
-        }
+        return await run_pipeline("merge-pdf", input_paths, input_hashes, "merged_document.pdf", options, request=request)
         
+    except HTTPException:
+        remove_files(input_paths)
+        raise
     except Exception as e:
         # Cleanup on error
-        for input_path in input_paths:
-            if os.path.exists(input_path):
-                os.remove(input_path)
+        remove_files(input_paths)
         raise HTTPException(status_code=500, detail=f"Merge error: {str(e)}")
 
 @app.post("/convert/pdf-to-images")
 async def convert_pdf_to_images(
+    request: Request,
     file: UploadFile = File(...),
+    options: dict = Depends(image_options_form),
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ):
-    if not PDF2IMAGE_AVAILABLE:
-        raise HTTPException(
-            status_code=503, 
-            detail="PDF to Images conversion not available. Missing dependencies: pdf2image or Pillow"
-        )
+    ensure_converter_available("pdf-to-images")
     
     # Rate limiting
-    client_ip = "127.0.0.1"
-    check_rate_limit(client_ip)
-    cleanup_old_files()
+    await check_rate_limit(request, "pdf-to-images")
     
     # Validate file
     if not file.filename.lower().endswith('.pdf'):
@@ -685,58 +3369,17 @@ async def convert_pdf_to_images(
     validate_file_size(file)
     
     input_path = None
-    output_dir = None
     
     try:
         # Save uploaded file
         input_filename = generate_unique_filename(file.filename)
         input_path = os.path.join(UPLOAD_DIR, input_filename)
         
-        content = await file.read()
-        await write_file(input_path, content)
+        upload = await save_upload(file, input_path)
         
         print(f"Saved uploaded file to: {input_path}")
         
-        # Create output directory for images
-        output_dir = os.path.join(UPLOAD_DIR, f"images_{uuid.uuid4()}")
-        os.makedirs(output_dir, exist_ok=True)
-        
-        print(f"Created output directory: {output_dir}")
-        
-        # Convert PDF to images with enhanced error handling
-        image_paths = await pdf_to_images_converter(input_path, output_dir)
-        
-        if not image_paths:
-            raise HTTPException(status_code=500, detail="PDF conversion failed. Could not extract images from PDF. The PDF file might be corrupted, password-protected, or in an unsupported format.")
-        
-        print(f"Successfully converted to {len(image_paths)} images")
-        
-        # Create ZIP file with all images
-        zip_filename = f"pdf_images_{uuid.uuid4().hex[:8]}.zip"
-        zip_path = os.path.join(UPLOAD_DIR, zip_filename)
-        
-        print(f"Creating ZIP file: {zip_path}")
-        
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for image_path in image_paths:
-                # Add file to zip with just the filename (not full path)
-                zipf.write(image_path, os.path.basename(image_path))
-                print(f"Added {os.path.basename(image_path)} to ZIP")
-        
-        # Cleanup input file and images directory
-        if os.path.exists(input_path):
-            os.remove(input_path)
-        if os.path.exists(output_dir):
-            shutil.rmtree(output_dir)
-        
-        print(f"Conversion completed successfully. ZIP file: {zip_filename}")
-        
-        return {
-            "message": f"PDF converted to {len(image_paths)} images successfully",
-            "download_url": f"/download/{zip_filename}",
-            "filename": zip_filename,
-            "image_count": len(image_paths)
-        }
+        return await run_pipeline("pdf-to-images", [input_path], [upload["sha256"]], file.filename, options, request=request)
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -747,27 +3390,196 @@ async def convert_pdf_to_images(
         traceback.print_exc()
         
         # Cleanup on error
-        if input_path and os.path.exists(input_path):
-            os.remove(input_path)
-        if output_dir and os.path.exists(output_dir):
-            shutil.rmtree(output_dir)
+        remove_files([input_path])
         raise HTTPException(status_code=500, detail=f"Conversion error: {str(e)}")
 
-@app.get("/download/{filename}")
-async def download_file(filename: str):
-    file_path = os.path.join(UPLOAD_DIR, filename)
+@app.post("/convert/batch")
+async def convert_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    target: str = Form(...),
+    image_options: dict = Depends(image_options_form),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+):
+    """Convert several files with one converter into a single archive with a manifest"""
+    if target not in BATCH_CONVERTERS:
+        raise HTTPException(status_code=400, detail=f"target must be one of: {', '.join(BATCH_CONVERTERS)}")
+    ensure_converter_available(target)
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"A batch takes at most {MAX_BATCH_FILES} files")
+    
+    await check_rate_limit(request, "batch")
+    
+    options = image_options if target == "pdf-to-images" else {}
+    extensions = JOB_CONVERTERS[target]["extensions"]
+    zip_filename = f"batch_{uuid.uuid4().hex[:8]}.zip"
+    zip_path = os.path.join(UPLOAD_DIR, zip_filename)
+    uploads = []
+    try:
+        # A file that cannot be accepted fails on its own, not the whole batch
+        for file in files:
+            upload = {"filename": file.filename or "file"}
+            uploads.append(upload)
+            if not upload["filename"].lower().endswith(extensions):
+                upload["error"] = f"Only {', '.join(extensions)} files are allowed"
+                continue
+            input_path = os.path.join(UPLOAD_DIR, generate_unique_filename(upload["filename"]))
+            try:
+                validate_file_size(file)
+                saved = await save_upload(file, input_path)
+            except HTTPException as e:
+                upload["error"] = e.detail
+                continue
+            upload["path"] = input_path
+            upload["sha256"] = saved["sha256"]
+        
+        manifest = await process_batch(target, uploads, options, zip_path, request)
+    except BaseException:
+        remove_files([upload.get("path") for upload in uploads] + [zip_path])
+        raise
+    
+    await publish_output(zip_path, zip_filename, "batch", get_client_ip(request))
+    converted = sum(1 for entry in manifest if entry["status"] == "ok")
+    return {
+        "message": f"{converted} of {len(manifest)} files converted",
+        "download_url": f"/download/{zip_filename}",
+        "filename": zip_filename,
+        "converted": converted,
+        "failed": len(manifest) - converted,
+        "files": manifest
+    }
+
+@app.post("/jobs/{converter}", status_code=202)
+async def submit_job(
+    request: Request,
+    converter: str,
+    files: List[UploadFile] = File(...),
+    image_options: dict = Depends(image_options_form),
+    page_ranges: Optional[str] = Form(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)
+):
+    """Queue a conversion and return its job id without waiting for the result"""
+    spec = JOB_CONVERTERS.get(converter)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"Unknown converter: {converter}")
+    ensure_converter_available(converter)
+    options = image_options if converter == "pdf-to-images" else {}
     
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="File not found")
+    await check_rate_limit(request, converter)
+    prune_jobs()
     
+    pending = sum(1 for job in JOBS.values() if job["state"] in ("queued", "running"))
+    if pending >= MAX_PENDING_JOBS:
+        raise HTTPException(status_code=503, detail="Too many pending jobs. Try again later.")
+    
+    if not spec["min_files"] <= len(files) <= spec["max_files"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{converter} takes between {spec['min_files']} and {spec['max_files']} files"
+        )
+    
+    if converter == "merge-pdf":
+        options = build_merge_options(page_ranges, len(files))
+    
+    for file in files:
+        if not file.filename.lower().endswith(spec["extensions"]):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Only {', '.join(spec['extensions'])} files are allowed"
+            )
+        validate_file_size(file)
+    
+    input_paths, input_hashes = await save_uploads(
+        files, MAX_MERGE_TOTAL_SIZE if converter == "merge-pdf" else None
+    )
+    
+    job_id = uuid.uuid4().hex
+    now = datetime.now().isoformat()
+    JOBS[job_id] = {
+        "job_id": job_id,
+        "converter": converter,
+        "state": "queued",
+        "stage": None,
+        "progress": {"done": 0, "total": None},
+        "created_at": now,
+        "updated_at": now,
+        "download_url": None,
+        "result": None,
+        "error": None,
+        "finished_ts": None,
+    }
+    task = asyncio.create_task(
+        run_job(job_id, converter, input_paths, input_hashes, files[0].filename, options, get_client_ip(request))
+    )
+    job_tasks.add(task)
+    task.add_done_callback(job_tasks.discard)
+    
+    return {
+        "job_id": job_id,
+        "state": "queued",
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events"
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Report the state and progress of a submitted job"""
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_snapshot(job)
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Stream a job's state, stage and page progress as server-sent events"""
+    if job_id not in JOBS:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        job_event_stream(job_id),
+        media_type="text/event-stream",
+        # Proxies must pass events through as they are sent
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.api_route("/download/{filename}", methods=["GET", "HEAD"])
+async def download_file(filename: str, request: Request):
+    """Serve a conversion output, with byte ranges and conditional requests"""
     # Security check
     if ".." in filename or "/" in filename or "\\" in filename:
         raise HTTPException(status_code=400, detail="Invalid filename")
     
-    return FileResponse(
-        path=file_path,
-        filename=filename,
-        media_type='application/octet-stream'
+    record = await asyncio.to_thread(get_artifact, filename)
+    if record is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    etag = f'"{record["sha256"]}"'
+    size = record["size"]
+    media_type = record["content_type"]
+    headers = download_headers(record)
+    if not_modified(request, etag, record["created_at"]):
+        return Response(status_code=304, headers=headers)
+    
+    byte_range = parse_byte_range(request, size, etag, record["created_at"])
+    if byte_range is None:
+        # Blobs on a local or shared filesystem are sent with sendfile
+        local_path = get_artifact_backend().local_path(filename)
+        if local_path is not None:
+            try:
+                stat = os.stat(local_path)
+            except OSError:
+                raise HTTPException(status_code=404, detail="File not found")
+            return FileResponse(path=local_path, filename=filename, media_type=media_type, headers=headers, stat_result=stat)
+        start, end = 0, size - 1
+        status_code = 200
+    else:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        status_code = 206
+    headers["Content-Length"] = str(end - start + 1)
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=headers, media_type=media_type)
+    return StreamingResponse(
+        artifact_chunks(filename, start, end), status_code=status_code, headers=headers, media_type=media_type
     )
 
 # Error handlers
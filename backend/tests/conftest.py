@@ -0,0 +1,9 @@
+"""main.py keeps its uploads, cache and SQLite stores relative to the
+working directory, so the tests import it from a scratch one."""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(tempfile.mkdtemp(prefix="backend_tests_"))
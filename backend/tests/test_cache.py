@@ -0,0 +1,70 @@
+"""Result cache: hits, misses and LRU eviction under CACHE_MAX_BYTES."""
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from corpus import corpus_file  # noqa: E402
+
+
+@pytest.fixture
+def empty_cache():
+    with main.cache_connection() as conn:
+        conn.execute("DELETE FROM entries")
+
+
+def store_blob(key: str, size: int, tmp_path):
+    source = tmp_path / key
+    source.write_bytes(b"x" * size)
+    blob = f"cache-{key}.bin"
+    main.get_artifact_backend().put(blob, str(source))
+    main.cache_put(key, "test", blob, size, {"size": size})
+    return blob
+
+
+def test_miss_then_hit(empty_cache, tmp_path, monkeypatch):
+    monkeypatch.setitem(main.RATE_LIMITS, "merge-pdf", 100)
+    pdfs = [corpus_file(str(tmp_path), ".pdf", 2, "text", variant) for variant in (1, 2)]
+
+    def merge():
+        files = [("files", (os.path.basename(path), open(path, "rb"))) for path in pdfs]
+        response = client.post("/convert/merge-pdf", files=files)
+        assert response.status_code == 200
+        return response.json()
+
+    with TestClient(main.app) as client:
+        hits, misses = main.cache_stats["hits"], main.cache_stats["misses"]
+        first = merge()
+        assert "cached" not in first
+        assert main.cache_stats["misses"] == misses + 1
+        second = merge()
+        assert second["cached"] is True
+        assert main.cache_stats["hits"] == hits + 1
+        # Each hit is its own artifact with the same content
+        assert second["filename"] != first["filename"]
+        assert client.get(second["download_url"]).content == client.get(first["download_url"]).content
+
+
+def test_lookup_of_unknown_key_misses(empty_cache):
+    assert main.cache_get("0" * 64) is None
+    assert main.cache_lookup("0" * 64, "merge-pdf") is None
+
+
+def test_least_recently_used_entry_is_evicted(empty_cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "CACHE_MAX_BYTES", 250)
+    backend = main.get_artifact_backend()
+    evictions = main.cache_stats["evictions"]
+    first = store_blob("first", 100, tmp_path)
+    second = store_blob("second", 100, tmp_path)
+    assert main.cache_get("first") is not None  # now more recently used than "second"
+    store_blob("third", 100, tmp_path)
+
+    assert main.cache_stats["evictions"] == evictions + 1
+    assert main.cache_get("second") is None
+    assert not backend.exists(second)
+    assert main.cache_get("first") == (first, 100, {"size": 100})
+    assert main.cache_get("third") is not None
@@ -0,0 +1,97 @@
+"""Client-disconnect cancellation against a real uvicorn server.
+
+Uploads a large DOCX to /convert/word-to-pdf over a raw socket, closes the
+socket while the conversion runs and checks that the server cancels it and
+leaves no output behind.
+
+Run from backend/:
+    python -m pytest tests
+"""
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "benchmarks"))
+from corpus import corpus_file  # noqa: E402
+
+CANCELLED = 'conversions_cancelled_total{converter="word-to-pdf",reason="disconnected"}'
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get(port: int, path: str) -> str:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+        return response.read().decode()
+
+
+def wait_for(check, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+@pytest.fixture
+def server(tmp_path):
+    """A uvicorn server running main:app in its own working directory"""
+    port = free_port()
+    env = dict(os.environ, CACHE_MAX_BYTES="0", WORD_TO_PDF_TIME_LIMIT="300")
+    log = open(tmp_path / "server.log", "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--app-dir", BACKEND_DIR, "main:app", "--port", str(port)],
+        cwd=tmp_path, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    try:
+        assert wait_for(lambda: get(port, "/health"), 30), "server did not start"
+        yield port, tmp_path
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+        log.close()
+
+
+def test_disconnect_cancels_conversion(server, tmp_path_factory):
+    port, workdir = server
+    docx = corpus_file(str(tmp_path_factory.mktemp("corpus")), ".docx", 800, "text")
+    with open(docx, "rb") as f:
+        content = f.read()
+
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="big.docx"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    head = (
+        "POST /convert/word-to-pdf HTTP/1.1\r\n"
+        f"Host: 127.0.0.1:{port}\r\n"
+        f"Content-Type: multipart/form-data; boundary={boundary}\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode()
+
+    with socket.create_connection(("127.0.0.1", port)) as client:
+        client.sendall(head + body)
+        # Let the upload be saved and the conversion start, then hang up
+        time.sleep(1.5)
+
+    assert wait_for(lambda: CANCELLED in get(port, "/metrics"), 15), "conversion was not cancelled"
+    uploads = workdir / "uploads"
+    artifacts = workdir / "artifacts"
+    assert wait_for(lambda: not os.listdir(uploads), 10), os.listdir(uploads)
+    assert not artifacts.exists() or not [name for name in os.listdir(artifacts) if name.endswith(".pdf")]
@@ -0,0 +1,70 @@
+"""/download: conditional requests and byte ranges."""
+import hashlib
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+SIZE = 300_000
+
+
+@pytest.fixture
+def artifact(tmp_path):
+    data = os.urandom(SIZE)
+    source = tmp_path / "out.pdf"
+    source.write_bytes(data)
+    name = f"test-{hashlib.sha256(data).hexdigest()[:12]}.pdf"
+    main.publish_artifact(str(source), name, "test")
+    return f"/download/{name}", data
+
+
+def test_full_download_carries_validators(artifact):
+    url, data = artifact
+    response = TestClient(main.app).get(url)
+    assert response.status_code == 200
+    assert response.content == data
+    assert response.headers["etag"] == f'"{hashlib.sha256(data).hexdigest()}"'
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_if_none_match_returns_304(artifact):
+    url, _ = artifact
+    client = TestClient(main.app)
+    etag = client.get(url).headers["etag"]
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert client.get(url, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=-10", SIZE - 10, SIZE - 1),
+    ("bytes=100-", 100, SIZE - 1),
+    ("bytes=100-999999", 100, SIZE - 1),
+])
+def test_single_range_returns_206(artifact, header, start, end):
+    url, data = artifact
+    response = TestClient(main.app).get(url, headers={"Range": header})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes {start}-{end}/{SIZE}"
+    assert int(response.headers["content-length"]) == end - start + 1
+    assert response.content == data[start:end + 1]
+
+
+@pytest.mark.parametrize("header", [f"bytes={SIZE}-", "bytes=-0"])
+def test_unsatisfiable_range_returns_416(artifact, header):
+    url, _ = artifact
+    response = TestClient(main.app).get(url, headers={"Range": header})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{SIZE}"
+
+
+def test_stale_if_range_gets_the_whole_file(artifact):
+    url, data = artifact
+    response = TestClient(main.app).get(url, headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+    assert response.status_code == 200
+    assert response.content == data
@@ -0,0 +1,71 @@
+"""Rate limiter: sliding window, per-endpoint limits and client addresses behind proxies."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import main
+
+
+def request_from(peer: str, forwarded: str = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded is not None else []
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers, "client": (peer, 40000)})
+
+
+@pytest.fixture
+def behind_proxy(monkeypatch):
+    monkeypatch.setattr(main, "TRUST_PROXY_HEADERS", True)
+    monkeypatch.setattr(main, "TRUSTED_PROXY_HOPS", 1)
+
+
+def test_client_ip_is_taken_from_the_right(behind_proxy, monkeypatch):
+    assert main.get_client_ip(request_from("10.0.0.2", "6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+    monkeypatch.setattr(main, "TRUSTED_PROXY_HOPS", 2)
+    assert main.get_client_ip(request_from("10.0.0.2", "6.6.6.6, 203.0.113.7, 10.0.0.1")) == "203.0.113.7"
+    # Fewer entries than trusted hops: fall back to the peer
+    assert main.get_client_ip(request_from("10.0.0.2", "203.0.113.7")) == "10.0.0.2"
+
+
+def test_forwarded_header_ignored_without_trusted_proxy():
+    assert main.get_client_ip(request_from("198.51.100.4", "6.6.6.6")) == "198.51.100.4"
+
+
+def test_spoofed_forwarded_for_shares_the_clients_bucket(behind_proxy, monkeypatch):
+    monkeypatch.setitem(main.RATE_LIMITS, "spoof-test", 2)
+    # The proxy appends the real address to whatever the client sent
+    for spoofed in ("1.1.1.1", "2.2.2.2"):
+        asyncio.run(main.check_rate_limit(request_from("10.0.0.2", f"{spoofed}, 203.0.113.9"), "spoof-test"))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main.check_rate_limit(request_from("10.0.0.2", "3.3.3.3, 203.0.113.9"), "spoof-test"))
+    assert error.value.status_code == 429
+
+
+def test_sliding_window_boundary():
+    key, limit, window = "window-test", 10, 60
+    for second in range(limit):
+        assert main.rate_limit_hit(key, limit, window, 60 + second) == 0
+    # Full for the rest of the window
+    assert main.rate_limit_hit(key, limit, window, 70) == 50
+    # At the boundary the previous window still counts in full
+    assert main.rate_limit_hit(key, limit, window, 120) == 1.0
+    # Half way through the next window half of it is left: five more fit
+    for _ in range(5):
+        assert main.rate_limit_hit(key, limit, window, 150) == 0
+    assert main.rate_limit_hit(key, limit, window, 150) > 0
+    # Two windows on nothing is left
+    assert main.rate_limit_hit(key, limit, window, 240) == 0
+
+
+def test_endpoint_limits_are_separate(monkeypatch):
+    monkeypatch.setitem(main.RATE_LIMITS, "merge-pdf", 1)
+    client = TestClient(main.app)
+    pdfs = [("files", ("a.pdf", b"%PDF-1.4")), ("files", ("b.pdf", b"%PDF-1.4"))]
+    client.post("/convert/merge-pdf", files=pdfs)
+    response = client.post("/convert/merge-pdf", files=pdfs)
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+    # Other endpoints keep their own budget
+    response = client.post("/convert/pdf-to-word", files={"file": ("a.txt", b"x")})
+    assert response.status_code == 400
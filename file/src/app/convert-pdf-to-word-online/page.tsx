@@ -4,8 +4,8 @@ import { useState, useEffect } from 'react';
 import Head from 'next/head';
 import Link from 'next/link';
 import FileUpload from '@/components/FileUpload';
-import { FileWithId, ConversionResponse } from '@/types';
-import { ApiService, getAcceptedFileTypes } from '@/lib/api';
+import { FileWithId, ConversionResponse, JobStatus, UploadProgress } from '@/types';
+import { ApiService, getAcceptedFileTypes, getJobPercentage } from '@/lib/api';
 
 export default function PdfToWordPage() {
   const [files, setFiles] = useState<FileWithId[]>([]);
@@ -50,17 +50,27 @@ export default function PdfToWordPage() {
         const fileWithId = files[i];
         
         try {
-          const updateProgress = (progress: any) => {
+          const updateProgress = (progress: UploadProgress) => {
             setFiles(prev => prev.map(f => 
               f.id === fileWithId.id 
-                ? { ...f, progress: progress.percentage, status: 'processing' as const }
+                ? { ...f, progress: progress.percentage, status: 'uploading' as const }
                 : f
             ));
           };
 
-          const result: ConversionResponse = await ApiService.convertPdfToWord(
-            fileWithId.file, 
-            updateProgress
+          const updateJob = (job: JobStatus) => {
+            setFiles(prev => prev.map(f => 
+              f.id === fileWithId.id 
+                ? { ...f, progress: getJobPercentage(job), stage: job.stage, status: 'processing' as const }
+                : f
+            ));
+          };
+
+          const result: ConversionResponse = await ApiService.convertWithProgress(
+            'pdf-to-word',
+            [fileWithId.file], 
+            updateProgress,
+            updateJob
           );
 
           setFiles(prev => prev.map(f => 
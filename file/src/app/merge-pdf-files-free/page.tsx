@@ -4,8 +4,8 @@ import { useState, useEffect } from 'react';
 import Head from 'next/head';
 import Link from 'next/link';
 import FileUpload from '@/components/FileUpload';
-import { FileWithId, ConversionResponse } from '@/types';
-import { ApiService, getAcceptedFileTypes } from '@/lib/api';
+import { FileWithId, ConversionResponse, JobStatus, UploadProgress } from '@/types';
+import { ApiService, getAcceptedFileTypes, getJobPercentage } from '@/lib/api';
 
 export default function MergePdfPage() {
   const [files, setFiles] = useState<FileWithId[]>([]);
@@ -52,16 +52,27 @@ export default function MergePdfPage() {
       const updatedFiles = files.map(f => ({ ...f, status: 'uploading' as const, progress: 0 }));
       setFiles(updatedFiles);
 
-      const updateProgress = (progress: any) => {
+      const updateProgress = (progress: UploadProgress) => {
         setFiles(prev => prev.map(f => ({ 
           ...f, 
           progress: progress.percentage, 
+          status: 'uploading' as const 
+        })));
+      };
+
+      const updateJob = (job: JobStatus) => {
+        setFiles(prev => prev.map(f => ({ 
+          ...f, 
+          progress: getJobPercentage(job), 
+          stage: job.stage, 
           status: 'processing' as const 
         })));
       };
 
       const filesToMerge = files.map(f => f.file);
-      const result: ConversionResponse = await ApiService.mergePdfs(filesToMerge, updateProgress);
+      const result: ConversionResponse = await ApiService.convertWithProgress(
+        'merge-pdf', filesToMerge, updateProgress, updateJob
+      );
 
       setFiles(prev => prev.map(f => ({ 
         ...f, 
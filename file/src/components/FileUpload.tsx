@@ -4,6 +4,7 @@ import { useCallback, useState, useRef, useEffect } from 'react';
 import { useDropzone } from 'react-dropzone';
 import { DropzoneProps, FileWithId } from '@/types';
 import { validateFile, formatFileSize } from '@/lib/api';
+import ProgressBar from '@/components/ProgressBar';
 
 interface FileUploadProps extends DropzoneProps {
   onFilesChange: (files: FileWithId[]) => void;
@@ -198,21 +199,6 @@ export default function FileUpload({
     }
   };
 
-  const getProgressBarColor = (status: string) => {
-    switch (status) {
-      case 'completed':
-        return 'bg-gradient-to-r from-green-500 to-emerald-500';
-      case 'error':
-        return 'bg-gradient-to-r from-red-500 to-pink-500';
-      case 'uploading':
-        return 'bg-gradient-to-r from-blue-500 to-cyan-500';
-      case 'processing':
-        return 'bg-gradient-to-r from-purple-500 to-indigo-500';
-      default:
-        return 'bg-gradient-to-r from-gray-500 to-slate-500';
-    }
-  };
-
   return (
     <div className="w-full max-w-5xl mx-auto">
       {/* Enhanced Dropzone */}
@@ -424,25 +410,11 @@ export default function FileUpload({
                   {(fileWithId.status === 'uploading' || 
                     fileWithId.status === 'processing' || 
                     fileWithId.status === 'completed') && (
-                    <div className="mt-4">
-                      <div className="flex items-center justify-between mb-2">
-                        <span className="text-sm font-medium text-gray-700">
-                          {fileWithId.status === 'uploading' ? 'Uploading...' : 
-                           fileWithId.status === 'processing' ? 'Converting...' : 'Complete'}
-                        </span>
-                        <span className="text-sm font-medium text-gray-700">
-                          {fileWithId.progress}%
-                        </span>
-                      </div>
-                      <div className="w-full bg-gray-200 rounded-full h-3 overflow-hidden">
-                        <div
-                          className={`h-3 rounded-full transition-all duration-500 ease-out ${getProgressBarColor(fileWithId.status)}`}
-                          style={{ width: `${fileWithId.progress}%` }}
-                        >
-                          <div className="h-full w-full bg-gradient-to-r from-transparent via-white to-transparent opacity-30 animate-pulse"></div>
-                        </div>
-                      </div>
-                    </div>
+                    <ProgressBar
+                      status={fileWithId.status}
+                      progress={fileWithId.progress}
+                      stage={fileWithId.stage}
+                    />
                   )}
 
                   {/* Error Message */}
@@ -0,0 +1,64 @@
+'use client';
+
+import { FileWithId } from '@/types';
+
+interface ProgressBarProps {
+  status: FileWithId['status'];
+  progress: number;
+  stage?: string | null;
+}
+
+// Labels for the stages the conversion service reports while a job runs
+const STAGE_LABELS: Record<string, string> = {
+  started: 'Starting...',
+  extract: 'Extracting text...',
+  build: 'Building document...',
+  render: 'Rendering pages...',
+  layout: 'Laying out pages...',
+  merge: 'Merging files...',
+  write: 'Writing PDF...',
+};
+
+const getProgressBarColor = (status: string) => {
+  switch (status) {
+    case 'completed':
+      return 'bg-gradient-to-r from-green-500 to-emerald-500';
+    case 'error':
+      return 'bg-gradient-to-r from-red-500 to-pink-500';
+    case 'uploading':
+      return 'bg-gradient-to-r from-blue-500 to-cyan-500';
+    case 'processing':
+      return 'bg-gradient-to-r from-purple-500 to-indigo-500';
+    default:
+      return 'bg-gradient-to-r from-gray-500 to-slate-500';
+  }
+};
+
+const getLabel = (status: string, stage?: string | null) => {
+  if (status === 'uploading') return 'Uploading...';
+  if (status === 'processing') return (stage && STAGE_LABELS[stage]) || 'Converting...';
+  return 'Complete';
+};
+
+export default function ProgressBar({ status, progress, stage }: ProgressBarProps) {
+  return (
+    <div className="mt-4">
+      <div className="flex items-center justify-between mb-2">
+        <span className="text-sm font-medium text-gray-700">
+          {getLabel(status, stage)}
+        </span>
+        <span className="text-sm font-medium text-gray-700">
+          {progress}%
+        </span>
+      </div>
+      <div className="w-full bg-gray-200 rounded-full h-3 overflow-hidden">
+        <div
+          className={`h-3 rounded-full transition-all duration-500 ease-out ${getProgressBarColor(status)}`}
+          style={{ width: `${progress}%` }}
+        >
+          <div className="h-full w-full bg-gradient-to-r from-transparent via-white to-transparent opacity-30 animate-pulse"></div>
+        </div>
+      </div>
+    </div>
+  );
+}
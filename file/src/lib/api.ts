@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { ConversionResponse, ConversionType, HealthStatus, UploadProgress } from '@/types';
+import { ConversionResponse, ConversionType, HealthStatus, JobStatus, JobSubmission, UploadProgress } from '@/types';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:5000';
 
@@ -55,6 +55,7 @@ apiClient.interceptors.response.use(
 
 // Progress callback type
 type ProgressCallback = (progress: UploadProgress) => void;
+type JobCallback = (job: JobStatus) => void;
 
 export class ApiService {
   
@@ -242,6 +243,91 @@ export class ApiService {
     }
   }
 
+  // Queue a conversion as a background job; the server answers before converting
+  static async submitJob(
+    type: ConversionType,
+    files: File[],
+    onProgress?: ProgressCallback
+  ): Promise<JobSubmission> {
+    const formData = new FormData();
+    files.forEach((file) => {
+      formData.append('files', file);
+    });
+
+    const requestConfig: RequestConfig = {
+      headers: { 'Content-Type': 'multipart/form-data' },
+      timeout: 300000, // 5 minutes for uploads
+    };
+
+    if (onProgress) {
+      requestConfig.onUploadProgress = (event: any) => {
+        if (event.total) {
+          onProgress({
+            loaded: event.loaded,
+            total: event.total,
+            percentage: Math.round((event.loaded * 100) / event.total)
+          });
+        }
+      };
+    }
+
+    try {
+      const response = await apiClient.post<JobSubmission>(`/jobs/${type}`, formData, requestConfig);
+      return response.data;
+    } catch (error: any) {
+      if (error.response?.data?.detail) {
+        throw new Error(error.response.data.detail);
+      }
+      if (error.code === 'ECONNREFUSED') {
+        throw new Error('Cannot connect to conversion service. Please try again later.');
+      }
+      throw new Error('Could not start the conversion');
+    }
+  }
+
+  // Follow a job's server-sent events until it finishes; resolves with its result
+  static watchJob(submission: JobSubmission, onUpdate?: JobCallback): Promise<ConversionResponse> {
+    return new Promise((resolve, reject) => {
+      const source = new EventSource(`${API_BASE_URL}${submission.events_url}`);
+
+      source.addEventListener('progress', (event) => {
+        onUpdate?.(JSON.parse((event as MessageEvent).data));
+      });
+
+      source.addEventListener('completed', (event) => {
+        source.close();
+        const job: JobStatus = JSON.parse((event as MessageEvent).data);
+        onUpdate?.(job);
+        resolve(job.result as ConversionResponse);
+      });
+
+      source.addEventListener('failed', (event) => {
+        source.close();
+        const job: JobStatus = JSON.parse((event as MessageEvent).data);
+        onUpdate?.(job);
+        reject(new Error(job.error || 'Conversion failed'));
+      });
+
+      // EventSource reconnects by itself while the stream is open; a closed one means the job is gone
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+          reject(new Error('Lost connection to the conversion service'));
+        }
+      };
+    });
+  }
+
+  // Upload files as a job and follow it to the end: onProgress sees the upload, onUpdate the conversion
+  static async convertWithProgress(
+    type: ConversionType,
+    files: File[],
+    onProgress?: ProgressCallback,
+    onUpdate?: JobCallback
+  ): Promise<ConversionResponse> {
+    const submission = await this.submitJob(type, files, onProgress);
+    return this.watchJob(submission, onUpdate);
+  }
+
   static getDownloadUrl(filename: string): string {
     return `${API_BASE_URL}/download/${filename}`;
   }
@@ -341,6 +427,13 @@ export const formatFileSize = (bytes: number): string => {
   return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
 };
 
+// Share of the job's current stage that is done, 0 while the page count is unknown
+export const getJobPercentage = (job: JobStatus): number => {
+  const { done, total } = job.progress;
+  if (!total) return job.state === 'completed' ? 100 : 0;
+  return Math.min(100, Math.round((done * 100) / total));
+};
+
 export const validateFile = (file: File, allowedTypes: string[]): string | null => {
   const fileExtension = file.name.split('.').pop()?.toLowerCase();
   const isValidType = allowedTypes.some(type => {
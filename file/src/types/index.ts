@@ -20,11 +20,37 @@ export interface UploadProgress {
   percentage: number;
 }
 
+export type JobState = 'queued' | 'running' | 'completed' | 'failed';
+
+export interface JobSubmission {
+  job_id: string;
+  state: JobState;
+  status_url: string;
+  events_url: string;
+}
+
+export interface JobStatus {
+  job_id: string;
+  converter: ConversionType;
+  state: JobState;
+  stage: string | null;
+  progress: {
+    done: number;
+    total: number | null;
+  };
+  created_at: string;
+  updated_at: string;
+  download_url: string | null;
+  result: ConversionResponse | null;
+  error: string | null;
+}
+
 export interface FileWithId {
   file: File;
   id: string;
   progress: number;
   status: 'pending' | 'uploading' | 'processing' | 'completed' | 'error';
+  stage?: string | null;
   error?: string;
   downloadUrl?: string;
 }
@@ -47,6 +73,15 @@ export interface HealthStatus {
     'python-docx': boolean;
     pdf2image: boolean;
   };
+  converters?: Record<string, {
+    available: boolean;
+    missing: string[];
+    warm_up: boolean;
+  }>;
+  poppler?: {
+    path: string | null;
+    available: boolean;
+  };
 }
 
 export interface NavigationItem {